@@ -2,15 +2,28 @@ from __future__ import annotations
 
 from collections.abc import Generator
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import anthropic
 import openai
 import requests
 import streamlit as st
 
-from backend import has_api_key, stream_tier_response, validate_startup
+from backend import (
+    find_reusable_response,
+    has_api_key,
+    start_prefetch,
+    stream_tier_response,
+    validate_startup,
+)
+from config import MEDIA, PROFILE
 from constants import PRESET_PROMPTS, TIER3_MODEL_LABELS, TIERS, Tier3Model
+from media import MEDIA_LIBRARY
+from models.circuit_breaker import CircuitOpenError
+from prefetch import PrefetchedResponse, PrefetchKey
+from profiling import PROFILER
 from prompts import TIER_2_SYSTEM_PROMPT, TIER_3_SYSTEM_PROMPT
+from response_index import IndexMatch
 from state import clear_responses, init_state
 
 _PROJECT_DIR = Path(__file__).parent
@@ -32,6 +45,9 @@ st.markdown(f"<style>{_css_path.read_text()}</style>", unsafe_allow_html=True)
 
 init_state()
 
+if PROFILE.enabled:
+    PROFILER.profile_rerun({"session": st.session_state.session_id[:8]})
+
 # ── Startup validation ───────────────────────────────────────────────────────
 
 startup = validate_startup()
@@ -61,6 +77,97 @@ def _stream_to_placeholder(token_stream: Generator[str, None, None]) -> str:
     return accumulated
 
 
+def _prefetch_key(tier_num: int) -> PrefetchKey:
+    """Return what a send to this tier would generate with the current inputs."""
+    system_prompts = {
+        1: None,
+        2: st.session_state.tier2_system_prompt,
+        3: st.session_state.tier3_system_prompt,
+    }
+    return PrefetchKey(
+        tier_num=tier_num,
+        prompt=st.session_state.prompt,
+        system_prompt=system_prompts[tier_num],
+        # Only Tier 3 depends on the model toggle
+        tier3_model=st.session_state.tier3_selected_model if tier_num == 3 else "claude",
+    )
+
+
+def _response_key(tier_num: int) -> str:
+    """Return the session-state key holding a tier's cached response."""
+    if tier_num == 3:
+        return f"tier3_{st.session_state.tier3_selected_model}_response"
+    return f"tier{tier_num}_response"
+
+
+def _reuse_label(match: IndexMatch) -> str:
+    # Never quote the stored prompt: it may be another attendee's words.
+    if match.similarity == 1.0:
+        kind = "the same prompt"
+    else:
+        kind = f"a similar prompt ({match.similarity:.0%} match)"
+    return f"♻️ Reused response, originally generated for {kind}"
+
+
+def _tier_stream(tier_num: int) -> Generator[str, None, None]:
+    """Return the token stream for a send.
+
+    Prefers a matching prefetch, then a stored response to a near-duplicate
+    prompt (labelled as reused), then a fresh generation. Re-sends always
+    generate fresh.
+    """
+    key = _prefetch_key(tier_num)
+    response_key = _response_key(tier_num)
+    st.session_state.reused_from.pop(response_key, None)
+
+    prefetched: PrefetchedResponse | None = st.session_state.prefetched
+    if prefetched is not None and prefetched.key.tier_num == tier_num:
+        st.session_state.prefetched = None
+        if prefetched.key == key and not prefetched.failed:
+            return prefetched.stream()
+        prefetched.cancel()
+
+    is_resend = st.session_state[response_key] is not None
+    match = None if is_resend else find_reusable_response(
+        tier_num, key.prompt, key.tier3_model, system_prompt=key.system_prompt,
+    )
+    if match is not None:
+        label = _reuse_label(match)
+        st.session_state.reused_from[response_key] = label
+        st.caption(label)
+        return iter([match.response])
+
+    return stream_tier_response(
+        tier_num,
+        key.prompt,
+        key.tier3_model,
+        system_prompt=key.system_prompt,
+        session_id=st.session_state.session_id,
+    )
+
+
+def _prefetch_next_tier(tier_num: int) -> None:
+    """After a tier finishes, quietly start generating the next one."""
+    next_tier = tier_num + 1
+    tier3_model: Tier3Model = st.session_state.tier3_selected_model
+    if next_tier == 2:
+        available = startup.ollama_available
+        cached = st.session_state.tier2_response
+    else:
+        available = startup.tier3_available(tier3_model)
+        cached = st.session_state[_response_key(3)]
+    if not available or cached is not None:
+        return
+
+    key = _prefetch_key(next_tier)
+    current: PrefetchedResponse | None = st.session_state.prefetched
+    if current is not None:
+        if current.key == key:
+            return
+        current.cancel()
+    st.session_state.prefetched = start_prefetch(key, st.session_state.session_id)
+
+
 def _render_tier_header(tier_num: int) -> None:
     """Render the styled header card for a tier."""
     tier = TIERS[tier_num]
@@ -149,8 +256,10 @@ def _render_behind_the_scenes(tier_num: int) -> None:
         st.markdown(f"**What this tier demonstrates:** {tier.explanation}")
 
 
-def _render_cached_response(text: str) -> None:
-    """Display a previously-cached response."""
+def _render_cached_response(text: str, reused_label: str | None = None) -> None:
+    """Display a previously-cached response, with its label if it was reused."""
+    if reused_label:
+        st.caption(reused_label)
     st.markdown(
         f'<div class="response-area">\n\n{text}\n\n</div>',
         unsafe_allow_html=True,
@@ -166,6 +275,47 @@ def _render_placeholder() -> None:
     )
 
 
+def _media_url(path: Path) -> str | None:
+    """Return the shared media server's URL for `path`, or None to let Streamlit serve it."""
+    if not MEDIA.serve_separately:
+        return None
+    media_path = MEDIA_LIBRARY.path_for(path)
+    if media_path is None:
+        return None
+    if MEDIA.public_url:
+        return MEDIA.public_url.rstrip("/") + media_path
+    hostname = urlsplit(st.context.url).hostname or "localhost"
+    if ":" in hostname:
+        hostname = f"[{hostname}]"
+    return f"http://{hostname}:{MEDIA_LIBRARY.server_port}{media_path}"
+
+
+def _render_profiling_panel() -> None:
+    """Render the debug panel ranking the slowest recent reruns."""
+    with st.expander("🐢 Profiling: slowest recent reruns"):
+        reruns = PROFILER.slowest_recent_reruns()
+        if not reruns:
+            st.markdown("_No reruns profiled yet._")
+            return
+        rows = [
+            "| Duration | Started | Session | Hottest functions (self samples) |",
+            "|---:|---|---|---|",
+        ]
+        for rerun in reruns:
+            hottest = sorted(rerun.functions, key=lambda f: f.self_samples, reverse=True)[:3]
+            hottest_text = "<br>".join(
+                f"`{f.function}` ({f.self_samples})" for f in hottest if f.self_samples
+            )
+            rows.append(
+                f"| {rerun.duration_seconds * 1000:.0f} ms"
+                f" | {rerun.started_at:%H:%M:%S}"
+                f" | {rerun.tags.get('session', '')}"
+                f" | {hottest_text} |"
+            )
+        st.markdown("\n".join(rows), unsafe_allow_html=True)
+        st.caption(f"Collapsed stacks and per-function summaries: `{PROFILE.directory}/`")
+
+
 # ── Layout ───────────────────────────────────────────────────────────────────
 
 st.markdown("# Under the Hood: How AI Responds to Mental Health")
@@ -213,6 +363,8 @@ with tab1:
 
     if not startup.ollama_ready:
         st.warning(startup.ollama_error)
+    elif startup.ollama_circuit_error:
+        st.warning(startup.ollama_circuit_error)
 
     has_prompt = bool(st.session_state.prompt.strip())
     has_cached = st.session_state.tier1_response is not None
@@ -222,7 +374,7 @@ with tab1:
     send_t1 = st.button(
         btn_label,
         key="send_t1",
-        disabled=not has_prompt or not startup.ollama_ready,
+        disabled=not has_prompt or not startup.ollama_available,
         use_container_width=True,
     )
     st.markdown("</div>", unsafe_allow_html=True)
@@ -230,13 +382,17 @@ with tab1:
     if send_t1:
         st.session_state.active_prompt = st.session_state.prompt
         try:
-            st.session_state.tier1_response = _stream_to_placeholder(
-                stream_tier_response(1, st.session_state.active_prompt),
-            )
+            st.session_state.tier1_response = _stream_to_placeholder(_tier_stream(1))
+            _prefetch_next_tier(1)
+        except CircuitOpenError as exc:
+            st.error(f"❌ Error: {exc}.")
         except requests.RequestException as exc:
             st.error(f"❌ Error: {exc}. Check that Ollama is running.")
     elif has_cached:
-        _render_cached_response(st.session_state.tier1_response)
+        _render_cached_response(
+            st.session_state.tier1_response,
+            st.session_state.reused_from.get("tier1_response"),
+        )
     else:
         _render_placeholder()
 
@@ -250,6 +406,8 @@ with tab2:
 
     if not startup.ollama_ready:
         st.warning(startup.ollama_error)
+    elif startup.ollama_circuit_error:
+        st.warning(startup.ollama_circuit_error)
 
     has_prompt = bool(st.session_state.prompt.strip())
     has_cached = st.session_state.tier2_response is not None
@@ -259,7 +417,7 @@ with tab2:
     send_t2 = st.button(
         btn_label,
         key="send_t2",
-        disabled=not has_prompt or not startup.ollama_ready,
+        disabled=not has_prompt or not startup.ollama_available,
         use_container_width=True,
     )
     st.markdown("</div>", unsafe_allow_html=True)
@@ -267,17 +425,17 @@ with tab2:
     if send_t2:
         st.session_state.active_prompt = st.session_state.prompt
         try:
-            st.session_state.tier2_response = _stream_to_placeholder(
-                stream_tier_response(
-                    2,
-                    st.session_state.active_prompt,
-                    system_prompt=st.session_state.tier2_system_prompt,
-                ),
-            )
+            st.session_state.tier2_response = _stream_to_placeholder(_tier_stream(2))
+            _prefetch_next_tier(2)
+        except CircuitOpenError as exc:
+            st.error(f"❌ Error: {exc}.")
         except requests.RequestException as exc:
             st.error(f"❌ Error: {exc}. Check that Ollama is running.")
     elif has_cached:
-        _render_cached_response(st.session_state.tier2_response)
+        _render_cached_response(
+            st.session_state.tier2_response,
+            st.session_state.reused_from.get("tier2_response"),
+        )
     else:
         _render_placeholder()
 
@@ -328,14 +486,18 @@ with tab3:
         cached_response = st.session_state.tier3_claude_response
         key_available = startup.has_anthropic_key
         missing_key_msg = "⚠️ ANTHROPIC_API_KEY not found. Set it in your .env file."
+        circuit_error = startup.anthropic_circuit_error
     else:
         has_cached = st.session_state.tier3_gpt_response is not None
         cached_response = st.session_state.tier3_gpt_response
         key_available = startup.has_openai_key
         missing_key_msg = "⚠️ OPENAI_API_KEY not found. Set it in your .env file."
+        circuit_error = startup.openai_circuit_error
 
     if not key_available:
         st.warning(missing_key_msg)
+    elif circuit_error:
+        st.warning(circuit_error)
 
     has_prompt = bool(st.session_state.prompt.strip())
     btn_label = "Re-send to Tier 3" if has_cached else "Send to Tier 3"
@@ -344,7 +506,7 @@ with tab3:
     send_t3 = st.button(
         btn_label,
         key="send_t3",
-        disabled=not has_prompt or not key_available,
+        disabled=not has_prompt or not startup.tier3_available(new_selection),
         use_container_width=True,
     )
     st.markdown("</div>", unsafe_allow_html=True)
@@ -352,30 +514,37 @@ with tab3:
     if send_t3:
         st.session_state.active_prompt = st.session_state.prompt
         try:
-            response = _stream_to_placeholder(
-                stream_tier_response(
-                    3,
-                    st.session_state.active_prompt,
-                    new_selection,
-                    system_prompt=st.session_state.tier3_system_prompt,
-                ),
-            )
+            response = _stream_to_placeholder(_tier_stream(3))
             if new_selection == "claude":
                 st.session_state.tier3_claude_response = response
             else:
                 st.session_state.tier3_gpt_response = response
+        except CircuitOpenError as exc:
+            st.error(f"❌ Error: {exc}.")
         except (anthropic.APIError, openai.APIError) as exc:
             st.error(
                 f"❌ Error: {exc}. Check your API key and internet connection."
             )
     elif has_cached:
-        _render_cached_response(cached_response)
+        _render_cached_response(
+            cached_response, st.session_state.reused_from.get(_response_key(3)),
+        )
     else:
         _render_placeholder()
 
     _render_behind_the_scenes(3)
 
 
+# ── Prefetch housekeeping ────────────────────────────────────────────────────
+
+# Runs once the prompt, system prompt and Tier 3 model widgets have updated
+# session state, so editing any of them discards the speculative response.
+_prefetched: PrefetchedResponse | None = st.session_state.prefetched
+if _prefetched is not None and _prefetched.key != _prefetch_key(_prefetched.key.tier_num):
+    _prefetched.cancel()
+    st.session_state.prefetched = None
+
+
 # ── Tier 4 ───────────────────────────────────────────────────────────────────
 
 with tab4:
@@ -383,6 +552,18 @@ with tab4:
 
     _left, _center, _right = st.columns([3, 2, 3])
     with _center:
-        st.video("assets/wysa-demo.MP4")
+        video_url = _media_url(MEDIA.tier4_video)
+        if video_url is not None:
+            st.video(video_url)
+        elif MEDIA.tier4_video.is_file():
+            st.video(str(MEDIA.tier4_video))
+        else:
+            st.info("The Wysa demo video isn't available on this machine.")
 
     _render_behind_the_scenes(4)
+
+
+# ── Profiling debug panel ────────────────────────────────────────────────────
+
+if PROFILE.enabled:
+    _render_profiling_panel()
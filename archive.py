@@ -0,0 +1,197 @@
+"""Append-only archive of completed generations for post-event analysis.
+
+Records are queued in memory by the streaming path and written by a
+background thread in batches, each batch appended as a gzip member to the
+current JSONL segment. Segments rotate once they pass a size limit.
+
+Stream an archive back out as JSONL with:
+
+    python -m archive [directory]
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import gzip
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from config import ARCHIVE
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_GLOB = "generations-*.jsonl.gz"
+
+
+class GenerationRecord(BaseModel):
+    started_at: datetime
+    tier: int
+    model: str
+    prompt: str
+    system_prompt_hash: str | None
+    response: str
+    chunk_count: int
+    first_token_seconds: float | None
+    total_seconds: float
+
+
+class ArchiveWriter:
+    """Batches records from a bounded queue onto rotating gzip JSONL segments.
+
+    `submit` never blocks the caller: if the queue is full the record is
+    dropped and counted in `dropped`.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        flush_interval: float,
+        batch_size: int,
+        queue_size: int,
+        segment_max_bytes: int,
+    ) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.segment_max_bytes = segment_max_bytes
+        self.dropped = 0
+        self._queue: queue.Queue[GenerationRecord | None] = queue.Queue(maxsize=queue_size)
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._segment: Path | None = None
+        self._segment_seq = 0
+
+    def submit(self, record: GenerationRecord) -> None:
+        """Queue a record for writing, starting the writer thread on first use."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Archive queue full; dropped generation (%d so far)", self.dropped)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(
+                    target=self._run, name="archive-writer", daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except OSError:
+                    logger.exception("Failed to write %d archived generations", len(batch))
+            if stop:
+                return
+
+    def _next_batch(self) -> tuple[list[GenerationRecord], bool]:
+        # Block for the first record, then gather more until the batch is full
+        # or the flush interval since that first record has elapsed.
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                record = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if record is None:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    def _write_batch(self, batch: list[GenerationRecord]) -> None:
+        segment = self._current_segment()
+        payload = "".join(record.model_dump_json() + "\n" for record in batch)
+        with gzip.open(segment, "ab") as f:
+            f.write(payload.encode("utf-8"))
+
+    def _current_segment(self) -> Path:
+        if self._segment is not None:
+            try:
+                if self._segment.stat().st_size < self.segment_max_bytes:
+                    return self._segment
+            except FileNotFoundError:
+                # Removed while running; without a new segment every later batch would fail
+                logger.warning("Archive segment %s was removed; starting a new one", self._segment)
+        self._segment_seq += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._segment = (
+            self.directory
+            / f"generations-{stamp}-{os.getpid()}-{self._segment_seq:04d}.jsonl.gz"
+        )
+        # The whole directory may have been removed too
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self._segment
+
+
+def iter_archive(directory: Path) -> Iterator[GenerationRecord]:
+    """Yield every archived record in a segment directory, oldest segment first."""
+    for line in iter_archive_lines(directory):
+        yield GenerationRecord.model_validate_json(line)
+
+
+def iter_archive_lines(directory: Path) -> Iterator[bytes]:
+    """Yield raw JSONL lines from a segment directory without parsing them."""
+    for segment in sorted(directory.glob(_SEGMENT_GLOB), key=lambda p: p.stat().st_mtime):
+        with gzip.open(segment, "rb") as f:
+            try:
+                yield from f
+            except EOFError:
+                # A batch cut off by a crash; everything before it is intact.
+                logger.warning("Segment %s ends in a truncated batch", segment)
+
+
+ARCHIVE_WRITER = ArchiveWriter(
+    directory=ARCHIVE.directory,
+    flush_interval=ARCHIVE.flush_interval,
+    batch_size=ARCHIVE.batch_size,
+    queue_size=ARCHIVE.queue_size,
+    segment_max_bytes=ARCHIVE.segment_max_bytes,
+)
+atexit.register(ARCHIVE_WRITER.close)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream archived generations as JSONL.")
+    parser.add_argument("directory", nargs="?", type=Path, default=ARCHIVE.directory)
+    args = parser.parse_args()
+
+    sys.stdout.buffer.writelines(iter_archive_lines(args.directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import hashlib
+import time
 from collections.abc import Generator
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
-from config import ANTHROPIC, OPENAI
+from archive import ARCHIVE_WRITER, GenerationRecord
+from config import ANTHROPIC, ARCHIVE, OLLAMA, OPENAI, PREFETCH, PROFILE, REUSE
 from constants import Tier3Model
-from models.anthropic_client import stream_anthropic_response
-from models.ollama_client import check_ollama_status, stream_ollama_response
-from models.openai_client import stream_openai_response
+from models.anthropic_client import ANTHROPIC_BREAKER, stream_anthropic_response
+from models.circuit_breaker import CircuitBreaker
+from models.ollama_client import (
+    OLLAMA_BREAKER,
+    OLLAMA_POOL,
+    check_ollama_status,
+    stream_ollama_response,
+)
+from models.openai_client import OPENAI_BREAKER, stream_openai_response
+from prefetch import PrefetchedResponse, PrefetchKey
+from profiling import PROFILER
 from prompts import TIER_1_SYSTEM_PROMPT, TIER_2_SYSTEM_PROMPT, TIER_3_SYSTEM_PROMPT
+from response_index import IndexMatch, ResponseIndex
+
+RESPONSE_INDEX = ResponseIndex(threshold=REUSE.threshold)
 
 
 def has_api_key(provider: Tier3Model) -> bool:
@@ -23,20 +38,158 @@ def stream_tier_response(
     prompt: str,
     tier3_model: Tier3Model = "claude",
     system_prompt: str | None = None,
+    session_id: str | None = None,
+    record: bool = True,
 ) -> Generator[str, None, None]:
-    """Single entry point that routes to the correct model client."""
-    if tier_num == 1:
-        return stream_ollama_response(prompt, TIER_1_SYSTEM_PROMPT)
-    if tier_num == 2:
-        return stream_ollama_response(
-            prompt, system_prompt if system_prompt is not None else TIER_2_SYSTEM_PROMPT,
+    """Single entry point that routes to the correct model client.
+
+    `session_id` pins a session's Ollama requests to a warm host. Completed
+    generations are queued for the archive and added to the reuse index, and
+    consumption is sample-profiled, when those are enabled. Pass
+    `record=False` for speculative generations nobody has seen yet.
+    """
+    sp, model = _resolve_route(tier_num, tier3_model, system_prompt)
+    if tier_num in (1, 2):
+        provider = "ollama"
+        token_stream = stream_ollama_response(prompt, sp, session_id, OLLAMA.profile)
+    elif tier3_model == "claude":
+        provider = "anthropic"
+        token_stream = stream_anthropic_response(prompt, sp)
+    else:
+        provider = "openai"
+        token_stream = stream_openai_response(prompt, sp)
+
+    if record and (ARCHIVE.enabled or REUSE.enabled):
+        token_stream = _record_stream(token_stream, tier_num, model, prompt, sp)
+    if PROFILE.enabled:
+        token_stream = PROFILER.profile_stream(
+            token_stream, {"tier": str(tier_num), "provider": provider},
         )
+    return token_stream
+
+
+def find_reusable_response(
+    tier_num: int,
+    prompt: str,
+    tier3_model: Tier3Model = "claude",
+    system_prompt: str | None = None,
+) -> IndexMatch | None:
+    """Return a stored response to the same or a near-duplicate prompt, if reuse is on."""
+    if not REUSE.enabled:
+        return None
+    sp, model = _resolve_route(tier_num, tier3_model, system_prompt)
+    return RESPONSE_INDEX.lookup(tier_num, model, sp, prompt)
 
-    # Tier 3
+
+def start_prefetch(key: PrefetchKey, session_id: str | None = None) -> PrefetchedResponse | None:
+    """Start generating a tier's response in the background for a later send.
+
+    Returns None when prefetch is disabled or the tier's provider is busy, so
+    speculative work never competes with real sends for a loaded provider.
+    The response is only archived and indexed for reuse once it is replayed.
+    """
+    if not PREFETCH.enabled or _provider_busy(key.tier_num, key.tier3_model):
+        return None
+    return PrefetchedResponse(
+        key,
+        stream_tier_response(
+            key.tier_num,
+            key.prompt,
+            key.tier3_model,
+            system_prompt=key.system_prompt,
+            session_id=session_id,
+            record=False,
+        ),
+        on_replayed=_record_prefetch if ARCHIVE.enabled or REUSE.enabled else None,
+    )
+
+
+def _provider_busy(tier_num: int, tier3_model: Tier3Model) -> bool:
+    if tier_num in (1, 2):
+        return (
+            OLLAMA_BREAKER.state != "closed"
+            or OLLAMA_POOL.least_in_flight() >= PREFETCH.max_ollama_in_flight
+        )
+    breaker = ANTHROPIC_BREAKER if tier3_model == "claude" else OPENAI_BREAKER
+    return breaker.state != "closed"
+
+
+def _resolve_route(
+    tier_num: int, tier3_model: Tier3Model, system_prompt: str | None,
+) -> tuple[str | None, str]:
+    """Return the (system prompt, model name) a tier request will use."""
+    if tier_num == 1:
+        return TIER_1_SYSTEM_PROMPT, OLLAMA.model
+    if tier_num == 2:
+        sp = system_prompt if system_prompt is not None else TIER_2_SYSTEM_PROMPT
+        return sp, OLLAMA.model
     sp = system_prompt if system_prompt is not None else TIER_3_SYSTEM_PROMPT
-    if tier3_model == "claude":
-        return stream_anthropic_response(prompt, sp)
-    return stream_openai_response(prompt, sp)
+    return sp, ANTHROPIC.model if tier3_model == "claude" else OPENAI.model
+
+
+def _record_stream(
+    token_stream: Generator[str, None, None],
+    tier_num: int,
+    model: str,
+    prompt: str,
+    system_prompt: str | None,
+) -> Generator[str, None, None]:
+    # Only the enqueue and index insert happen on the streaming path; disk
+    # writes are batched by the archive thread. Abandoned or failed streams
+    # are not recorded.
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    first_token_seconds: float | None = None
+    parts: list[str] = []
+    for token in token_stream:
+        if first_token_seconds is None:
+            first_token_seconds = time.perf_counter() - started
+        parts.append(token)
+        yield token
+
+    _record_generation(
+        tier_num, model, prompt, system_prompt,
+        started_at, parts, first_token_seconds, time.perf_counter() - started,
+    )
+
+
+def _record_prefetch(prefetched: PrefetchedResponse) -> None:
+    key = prefetched.key
+    system_prompt, model = _resolve_route(key.tier_num, key.tier3_model, key.system_prompt)
+    _record_generation(
+        key.tier_num, model, key.prompt, system_prompt, prefetched.started_at,
+        prefetched.tokens, prefetched.first_token_seconds, prefetched.total_seconds,
+    )
+
+
+def _record_generation(
+    tier_num: int,
+    model: str,
+    prompt: str,
+    system_prompt: str | None,
+    started_at: datetime,
+    parts: list[str],
+    first_token_seconds: float | None,
+    total_seconds: float,
+) -> None:
+    response = "".join(parts)
+    if REUSE.enabled:
+        RESPONSE_INDEX.add(tier_num, model, system_prompt, prompt, response)
+    if ARCHIVE.enabled:
+        ARCHIVE_WRITER.submit(GenerationRecord(
+            started_at=started_at,
+            tier=tier_num,
+            model=model,
+            prompt=prompt,
+            system_prompt_hash=(
+                hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+                if system_prompt is not None else None
+            ),
+            response=response,
+            chunk_count=len(parts),
+            first_token_seconds=first_token_seconds,
+            total_seconds=total_seconds,
+        ))
 
 
 @dataclass
@@ -45,6 +198,19 @@ class StartupStatus:
     ollama_error: str
     has_anthropic_key: bool
     has_openai_key: bool
+    ollama_circuit_error: str = ""
+    anthropic_circuit_error: str = ""
+    openai_circuit_error: str = ""
+
+    @property
+    def ollama_available(self) -> bool:
+        return self.ollama_ready and not self.ollama_circuit_error
+
+    def tier3_available(self, provider: Tier3Model) -> bool:
+        """Return whether the provider has a key and its circuit is not open."""
+        if provider == "claude":
+            return self.has_anthropic_key and not self.anthropic_circuit_error
+        return self.has_openai_key and not self.openai_circuit_error
 
     @property
     def warnings(self) -> list[str]:
@@ -55,15 +221,33 @@ class StartupStatus:
             msgs.append("ANTHROPIC_API_KEY not found.")
         if not self.has_openai_key:
             msgs.append("OPENAI_API_KEY not found.")
+        for circuit_error in (
+            self.ollama_circuit_error, self.anthropic_circuit_error, self.openai_circuit_error,
+        ):
+            if circuit_error:
+                msgs.append(circuit_error)
         return msgs
 
 
 def validate_startup() -> StartupStatus:
-    """Check Ollama status and API key availability."""
+    """Check Ollama status, API key availability and provider circuit breakers."""
     ollama_ready, ollama_error = check_ollama_status()
     return StartupStatus(
         ollama_ready=ollama_ready,
         ollama_error=ollama_error,
         has_anthropic_key=has_api_key("claude"),
         has_openai_key=has_api_key("gpt"),
+        ollama_circuit_error=_circuit_error(OLLAMA_BREAKER),
+        anthropic_circuit_error=_circuit_error(ANTHROPIC_BREAKER),
+        openai_circuit_error=_circuit_error(OPENAI_BREAKER),
+    )
+
+
+def _circuit_error(breaker: CircuitBreaker) -> str:
+    # Half-open circuits are left enabled so the next send can act as the probe.
+    if breaker.state != "open":
+        return ""
+    return (
+        f"⚠️ {breaker.name} is failing repeatedly. Sends are paused for"
+        f" {breaker.retry_after:.0f}s, then the next request will retry it."
     )
@@ -1,7 +1,34 @@
 from __future__ import annotations
 
-from pydantic import SecretStr
-from pydantic_settings import BaseSettings, SettingsConfigDict
+import logging
+from pathlib import Path
+from typing import Annotated
+
+from pydantic import (
+    BaseModel, Field, PrivateAttr, SecretStr, ValidationError, field_validator, model_validator,
+)
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaProfile(BaseModel):
+    """Autotuned settings for one model, written by `scripts/autotune_ollama.py`.
+
+    These are load-time options: a request with different values makes Ollama
+    reload the model. Tiers 1 and 2 therefore share one set, so switching
+    tiers or prefetching the next one never triggers a reload.
+    """
+
+    model: str
+    num_ctx: int | None = None
+    num_thread: int | None = None
+    num_batch: int | None = None
+    keep_alive: str | None = None
+
+    def options(self) -> dict[str, int]:
+        """Return the request `options` this profile sets."""
+        return self.model_dump(exclude_none=True, exclude={"model", "keep_alive"})
 
 
 class OllamaConfig(BaseSettings):
@@ -13,9 +40,48 @@ class OllamaConfig(BaseSettings):
     )
 
     host: str = "http://localhost:11434"
+    # Comma-separated list of Ollama hosts to load-balance across; overrides `host`
+    hosts: Annotated[list[str], NoDecode] = []
     model: str = "mistral:7b-instruct"
     num_predict: int = 400
     timeout: int = 60
+    circuit_failure_threshold: int = 3
+    circuit_reset_timeout: float = 30.0
+    host_cooldown: float = 15.0
+    # Autotuned runtime settings; ignored if missing, unreadable or tuned for another model
+    profile_path: Path = Path("ollama_profile.json")
+
+    _profile: OllamaProfile | None = PrivateAttr(default=None)
+
+    @field_validator("hosts", mode="before")
+    @classmethod
+    def _split_hosts(cls, value: str | list[str]) -> list[str]:
+        if isinstance(value, str):
+            return [h.strip().rstrip("/") for h in value.split(",") if h.strip()]
+        return value
+
+    @model_validator(mode="after")
+    def _load_profile(self) -> OllamaConfig:
+        if not self.profile_path.is_file():
+            return self
+        try:
+            profile = OllamaProfile.model_validate_json(self.profile_path.read_text())
+        except (OSError, ValidationError) as exc:
+            # A broken profile must not stop the app; Ollama's defaults still work
+            logger.warning("Ignoring Ollama profile %s: %s", self.profile_path, exc)
+            return self
+        if profile.model == self.model:
+            self._profile = profile
+        return self
+
+    @property
+    def all_hosts(self) -> list[str]:
+        return self.hosts or [self.host]
+
+    @property
+    def profile(self) -> OllamaProfile | None:
+        """Autotuned settings for `model`, or None to use Ollama's defaults."""
+        return self._profile
 
 
 class AnthropicConfig(BaseSettings):
@@ -30,6 +96,8 @@ class AnthropicConfig(BaseSettings):
     model: str = "claude-sonnet-4-5-20250929"
     max_tokens: int = 400
     timeout: int = 30
+    circuit_failure_threshold: int = 3
+    circuit_reset_timeout: float = 30.0
 
 
 class OpenAIConfig(BaseSettings):
@@ -44,8 +112,105 @@ class OpenAIConfig(BaseSettings):
     model: str = "gpt-5.2"
     max_tokens: int = 400
     timeout: int = 30
+    circuit_failure_threshold: int = 3
+    circuit_reset_timeout: float = 30.0
+
+
+class ArchiveConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="ARCHIVE_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    # Off by default: archives hold attendees' raw prompts
+    enabled: bool = False
+    directory: Path = Path("archive")
+    # Upper bound on how long a completed generation waits in memory before hitting disk
+    flush_interval: float = Field(default=2.0, gt=0)
+    batch_size: int = Field(default=64, ge=1)
+    queue_size: int = Field(default=10_000, ge=1)
+    segment_max_bytes: int = Field(default=8 * 1024 * 1024, ge=1)
+
+
+class PrefetchConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="PREFETCH_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    enabled: bool = False
+    # Skip Ollama prefetches unless some host has fewer generations in flight than this
+    max_ollama_in_flight: int = Field(default=1, ge=1)
+
+
+class ReuseConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="REUSE_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    enabled: bool = False
+    # Minimum Jaccard similarity of character shingles for a near-duplicate prompt
+    threshold: float = Field(default=0.8, gt=0, le=1)
+
+
+class ProfileConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="PROFILE_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    enabled: bool = False
+    directory: Path = Path("profiles")
+    interval: float = Field(default=0.005, gt=0)
+    # How many recent reruns the in-app debug panel ranks
+    recent_reruns: int = Field(default=50, ge=1)
+
+
+class MediaConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="MEDIA_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    tier4_video: Path = Path("assets/wysa-demo.MP4")
+    # The shared media server only runs when `port` is set, since browsers
+    # must be able to reach it; otherwise Streamlit serves the video.
+    # Defaults to the address Streamlit binds (`server.address`).
+    host: str | None = None
+    # 0 picks a free port, unless `public_url` is set
+    port: int | None = Field(default=None, ge=0, le=65535)
+    # Base URL browsers use to reach the media server, e.g. an HTTPS reverse proxy
+    # forwarding /media/. Defaults to http://<app host>:<port>.
+    public_url: str | None = None
+
+    @model_validator(mode="after")
+    def _require_port_for_public_url(self) -> MediaConfig:
+        # A proxy needs a fixed port to forward to
+        if self.public_url is not None and not self.port:
+            raise ValueError("MEDIA_PUBLIC_URL requires a fixed, non-zero MEDIA_PORT")
+        return self
+
+    @property
+    def serve_separately(self) -> bool:
+        return self.port is not None
 
 
 OLLAMA = OllamaConfig()
 ANTHROPIC = AnthropicConfig()
 OPENAI = OpenAIConfig()
+ARCHIVE = ArchiveConfig()
+PREFETCH = PrefetchConfig()
+REUSE = ReuseConfig()
+PROFILE = ProfileConfig()
+MEDIA = MediaConfig()
@@ -0,0 +1,200 @@
+"""Process-wide media assets, memory-mapped and served with HTTP range requests.
+
+`st.video(path)` re-reads and re-hashes the file and registers it with
+Streamlit's media manager on every rerun of every session. Instead, each asset
+is opened once per process: it is memory-mapped and content-hashed, then served
+by a small background HTTP server at an immutable URL,
+`/media/<sha256><suffix>`. A rerun only builds that URL. Switching tabs
+therefore touches neither the disk nor the heap, and all sessions share the
+same mapped pages.
+
+The app only uses this when `MEDIA_PORT` (with `MEDIA_PUBLIC_URL` behind a
+proxy) says how browsers reach the server. Otherwise it falls back to `st.video(path)`, which
+works anywhere Streamlit's own port does.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mimetypes
+import mmap
+import re
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from streamlit import config as st_config
+
+from config import MEDIA
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1 << 20
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+@dataclass(frozen=True)
+class MediaAsset:
+    path: Path
+    digest: str
+    content_type: str
+    data: mmap.mmap
+
+    @property
+    def name(self) -> str:
+        return f"{self.digest}{self.path.suffix.lower()}"
+
+    @classmethod
+    def open(cls, path: Path) -> MediaAsset:
+        """Map `path` read-only and hash its contents once."""
+        with path.open("rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return cls(path, hashlib.sha256(data).hexdigest(), content_type, data)
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    server: MediaServer
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def log_message(self, format: str, *args: object) -> None:
+        # Video players issue many small range requests; keep them out of the app log.
+        pass
+
+    def _serve(self, send_body: bool) -> None:
+        name = self.path.split("?", 1)[0].removeprefix("/media/")
+        asset = self.server.assets.get(name)
+        if asset is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        etag = f'"{asset.digest}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        size = len(asset.data)
+        byte_range = _parse_range(self.headers.get("Range"), size)
+        if byte_range is None:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range
+        if (start, end) == (0, size):
+            self.send_response(HTTPStatus.OK)
+        else:
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        # The URL names the content hash, so browsers never need to revalidate
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.end_headers()
+        if not send_body:
+            return
+
+        view = memoryview(asset.data)
+        try:
+            for offset in range(start, end, _CHUNK_SIZE):
+                self.wfile.write(view[offset:min(offset + _CHUNK_SIZE, end)])
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Players routinely abandon a range once they have seen enough
+        finally:
+            view.release()
+
+
+def _parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Return the `[start, end)` bytes to send, or None if unsatisfiable.
+
+    Only a single, valid range is honoured; anything else gets the whole
+    asset, as RFC 9110 requires for invalid ranges.
+    """
+    match = _RANGE.fullmatch(header.strip()) if header else None
+    if match is None or match.group(1) == match.group(2) == "":
+        return 0, size
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the final `last` bytes
+        return (max(size - int(last), 0), size) if int(last) > 0 else None
+    start = int(first)
+    if last and int(last) < start:
+        # An inverted range is invalid and must be ignored, not refused
+        return 0, size
+    if start >= size:
+        return None
+    return start, min(int(last) + 1, size) if last else size
+
+
+class MediaServer(ThreadingHTTPServer):
+    """Serves registered assets from memory; one thread per connection."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__((host, port), _MediaHandler)
+        self.assets: dict[str, MediaAsset] = {}
+
+
+class MediaLibrary:
+    """Opens each asset once and serves it from a lazily started `MediaServer`.
+
+    Failures (a missing file, a port in use) are logged once and remembered,
+    so later reruns neither retry nor touch the disk.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._server: MediaServer | None = None
+        self._paths: dict[Path, str | None] = {}
+
+    def path_for(self, path: Path) -> str | None:
+        """Return the server path serving `path`, or None if it can't be served."""
+        with self._lock:
+            if path not in self._paths:
+                self._paths[path] = self._publish(path)
+            return self._paths[path]
+
+    @property
+    def server_port(self) -> int | None:
+        with self._lock:
+            return self._server.server_address[1] if self._server is not None else None
+
+    def _publish(self, path: Path) -> str | None:
+        try:
+            asset = MediaAsset.open(path)
+            if self._server is None:
+                self._server = MediaServer(self.host, self.port)
+                threading.Thread(
+                    target=self._server.serve_forever, name="media-server", daemon=True,
+                ).start()
+                logger.info("Serving media on port %d", self._server.server_address[1])
+        except (OSError, ValueError) as exc:
+            # mmap raises ValueError for an empty file
+            logger.warning("Cannot serve media file %s: %s", path, exc)
+            return None
+        self._server.assets[asset.name] = asset
+        return f"/media/{asset.name}"
+
+
+# An unset `server.address` means Streamlit listens on every interface
+MEDIA_LIBRARY = MediaLibrary(
+    host=MEDIA.host or st_config.get_option("server.address") or "",
+    port=MEDIA.port or 0,
+)
@@ -6,16 +6,26 @@ import anthropic
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from config import ANTHROPIC
+from models.circuit_breaker import CircuitBreaker
+
+_RETRYABLE_ERRORS = (
+    anthropic.RateLimitError, anthropic.InternalServerError, anthropic.APIConnectionError,
+)
 
 _anthropic_retry = retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
-    retry=retry_if_exception_type(
-        (anthropic.RateLimitError, anthropic.InternalServerError, anthropic.APIConnectionError),
-    ),
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
     reraise=True,
 )
 
+ANTHROPIC_BREAKER = CircuitBreaker(
+    "Anthropic API",
+    failure_threshold=ANTHROPIC.circuit_failure_threshold,
+    reset_timeout=ANTHROPIC.circuit_reset_timeout,
+    is_failure=lambda exc: isinstance(exc, _RETRYABLE_ERRORS),
+)
+
 
 @_anthropic_retry
 def _create_stream(client: anthropic.Anthropic, prompt: str, system_prompt: str):
@@ -47,7 +57,22 @@ def stream_anthropic_response(
         timeout=ANTHROPIC.timeout,
     )
 
+    yield from ANTHROPIC_BREAKER.stream(_stream_text, client, prompt, system_prompt)
+
+
+def _stream_text(
+    client: anthropic.Anthropic, prompt: str, system_prompt: str,
+) -> Generator[str, None, None]:
     with _create_stream(client, prompt, system_prompt) as stream:
-        for event in stream:
-            if event.type == "content_block_delta" and event.delta.type == "text_delta":
-                yield event.delta.text
+        try:
+            for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield event.delta.text
+        except anthropic.APIError:
+            raise
+        except Exception as exc:
+            # A response that breaks off mid-stream raises the HTTP client's
+            # own error; report it as the connection error it is.
+            raise anthropic.APIConnectionError(
+                message=f"Stream interrupted: {exc}", request=stream.response.request,
+            ) from exc
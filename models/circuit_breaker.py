@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Generator, Iterator
+from typing import Literal, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+T = TypeVar("T")
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(
+            f"{name} is failing repeatedly; requests are paused for"
+            f" {retry_after:.0f}s before the next probe"
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Per-provider breaker that fails fast after repeated failures.
+
+    `closed` passes calls through. After `failure_threshold` consecutive
+    failures it becomes `open` and rejects calls for `reset_timeout` seconds,
+    then `half_open`, letting up to `half_open_max_calls` probes through. A
+    successful probe closes the circuit; a failed one reopens it.
+
+    `is_failure` decides which exceptions count against the provider, so
+    caller errors (bad key, bad request) don't trip the breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        is_failure: Callable[[BaseException], bool] = lambda exc: True,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._is_failure = is_failure
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probes_in_flight = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 unless open)."""
+        with self._lock:
+            if self._current_state() != "open":
+                return 0.0
+            return self._opened_at + self.reset_timeout - time.monotonic()
+
+    def call(self, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """Run `fn` through the breaker, raising CircuitOpenError if open."""
+        is_probe = self._acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            self._record_failure(is_probe, counts=self._is_failure(exc))
+            raise
+        self._record_success(is_probe)
+        return result
+
+    def stream(
+        self, fn: Callable[P, Iterator[T]], *args: P.args, **kwargs: P.kwargs,
+    ) -> Generator[T, None, None]:
+        """Run a streaming `fn` through the breaker, recording the outcome when it ends.
+
+        A provider that accepts a request but stalls mid-response still counts
+        as failing. Closing the stream early counts as a success.
+        """
+        is_probe = self._acquire()
+        try:
+            yield from fn(*args, **kwargs)
+        except GeneratorExit:
+            self._record_success(is_probe)
+            raise
+        except BaseException as exc:
+            self._record_failure(is_probe, counts=self._is_failure(exc))
+            raise
+        self._record_success(is_probe)
+
+    def reset(self) -> None:
+        """Force the circuit closed and forget past failures."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probes_in_flight = 0
+
+    def _current_state(self) -> CircuitState:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return False
+            if state == "half_open" and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            retry_after = max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _record_success(self, is_probe: bool) -> None:
+        with self._lock:
+            if is_probe:
+                self._probes_in_flight -= 1
+            self._failures = 0
+            self._opened_at = None
+
+    def _record_failure(self, is_probe: bool, counts: bool) -> None:
+        with self._lock:
+            if is_probe:
+                self._probes_in_flight -= 1
+            if not counts:
+                return
+            self._failures += 1
+            if is_probe or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import json
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
-from config import OLLAMA
+from config import OLLAMA, OllamaProfile
+from models.circuit_breaker import CircuitBreaker
+from models.ollama_pool import OllamaHostPool
 
 
 def _is_retryable_ollama_error(exc: BaseException) -> bool:
@@ -17,6 +20,13 @@ def _is_retryable_ollama_error(exc: BaseException) -> bool:
     return False
 
 
+def _is_ollama_host_failure(exc: BaseException) -> bool:
+    # Broader than the retry policy: a host that accepts the connection but
+    # never answers isn't worth retrying, yet it must trip the breaker and
+    # take the host out of rotation.
+    return isinstance(exc, requests.Timeout) or _is_retryable_ollama_error(exc)
+
+
 _ollama_retry = retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
@@ -24,14 +34,82 @@ _ollama_retry = retry(
     reraise=True,
 )
 
+OLLAMA_POOL = OllamaHostPool(OLLAMA.all_hosts, cooldown=OLLAMA.host_cooldown)
+
+
+def _is_ollama_pool_failure(exc: BaseException) -> bool:
+    # The failing host is already cooling down by the time this runs. While
+    # another host is healthy the pool routes around it, so only count
+    # failures once no healthy host remains.
+    return _is_ollama_host_failure(exc) and not OLLAMA_POOL.has_healthy_host()
+
+
+OLLAMA_BREAKER = CircuitBreaker(
+    "Ollama",
+    failure_threshold=OLLAMA.circuit_failure_threshold,
+    reset_timeout=OLLAMA.circuit_reset_timeout,
+    is_failure=_is_ollama_pool_failure,
+)
+
 
 def check_ollama_status() -> tuple[bool, str]:
-    """Check if Ollama is running and the configured model is available.
+    """Check if any Ollama host is running with the configured model available.
+
+    Hosts are probed concurrently and each result updates the host pool, so
+    routing skips hosts that failed their check. Returns (is_ready,
+    error_message). If is_ready is True, error_message is empty.
+    """
+    hosts = OLLAMA_POOL.hosts
+    with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        results = list(executor.map(_check_host, hosts))
+
+    errors: list[str] = []
+    for host, (ready, error) in zip(hosts, results):
+        if ready:
+            OLLAMA_POOL.mark_up(host)
+        else:
+            OLLAMA_POOL.mark_down(host)
+            errors.append(error if len(hosts) == 1 else f"{error} (host: {host})")
+
+    if len(errors) == len(hosts):
+        return False, errors[0]
+    return True, ""
+
+
+def stream_ollama_response(
+    prompt: str,
+    system_prompt: str | None = None,
+    session_id: str | None = None,
+    profile: OllamaProfile | None = None,
+) -> Generator[str, None, None]:
+    """Stream a chat response from Ollama, yielding tokens as they arrive.
 
-    Returns (is_ready, error_message). If is_ready is True, error_message is empty.
+    `session_id` keeps a session's follow-up requests on the same host when
+    it isn't overloaded, so the model and prompt cache stay warm. `profile`
+    adds autotuned runtime options (context size, threads, batch, keep-alive).
     """
+    messages: list[dict[str, str]] = []
+    if system_prompt is not None:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+
+    payload = {
+        "model": OLLAMA.model,
+        "messages": messages,
+        "stream": True,
+        "options": {"num_predict": OLLAMA.num_predict},
+    }
+    if profile is not None:
+        payload["options"].update(profile.options())
+        if profile.keep_alive is not None:
+            payload["keep_alive"] = profile.keep_alive
+
+    yield from OLLAMA_BREAKER.stream(_stream_chat, payload, session_id)
+
+
+def _check_host(host: str) -> tuple[bool, str]:
     try:
-        resp = requests.get(f"{OLLAMA.host}/api/tags", timeout=OLLAMA.timeout)
+        resp = requests.get(f"{host}/api/tags", timeout=OLLAMA.timeout)
         resp.raise_for_status()
     except requests.ConnectionError:
         return False, (
@@ -56,43 +134,40 @@ def check_ollama_status() -> tuple[bool, str]:
     return True, ""
 
 
-@_ollama_retry
-def _post_chat(payload: dict) -> requests.Response:
-    resp = requests.post(
-        f"{OLLAMA.host}/api/chat",
-        json=payload,
-        stream=True,
-        timeout=OLLAMA.timeout,
-    )
-    resp.raise_for_status()
-    return resp
-
-
-def stream_ollama_response(
-    prompt: str,
-    system_prompt: str | None = None,
-) -> Generator[str, None, None]:
-    """Stream a chat response from Ollama, yielding tokens as they arrive."""
-    messages: list[dict[str, str]] = []
-    if system_prompt is not None:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": prompt})
+def _stream_chat(payload: dict, session_id: str | None) -> Generator[str, None, None]:
+    resp, host = _post_chat(payload, session_id)
+    failed = False
+    try:
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            chunk = json.loads(line)
+            token = chunk.get("message", {}).get("content", "")
+            if token:
+                yield token
+            if chunk.get("done", False):
+                break
+    except requests.RequestException as exc:
+        failed = _is_ollama_host_failure(exc)
+        raise
+    finally:
+        resp.close()
+        OLLAMA_POOL.release(host, failed=failed)
 
-    payload = {
-        "model": OLLAMA.model,
-        "messages": messages,
-        "stream": True,
-        "options": {"num_predict": OLLAMA.num_predict},
-    }
 
-    resp = _post_chat(payload)
-
-    for line in resp.iter_lines(decode_unicode=True):
-        if not line:
-            continue
-        chunk = json.loads(line)
-        token = chunk.get("message", {}).get("content", "")
-        if token:
-            yield token
-        if chunk.get("done", False):
-            break
+@_ollama_retry
+def _post_chat(payload: dict, session_id: str | None) -> tuple[requests.Response, str]:
+    # Each retry attempt re-picks a host, so a dead host fails over to the next one.
+    host = OLLAMA_POOL.acquire(session_id)
+    try:
+        resp = requests.post(
+            f"{host}/api/chat",
+            json=payload,
+            stream=True,
+            timeout=OLLAMA.timeout,
+        )
+        resp.raise_for_status()
+    except requests.RequestException as exc:
+        OLLAMA_POOL.release(host, failed=_is_ollama_host_failure(exc))
+        raise
+    return resp, host
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# A session stays on its warm host unless that host is this many
+# generations busier than the least-loaded one.
+_AFFINITY_SLACK = 1
+_MAX_PINNED_SESSIONS = 4096
+
+
+@dataclass
+class _HostState:
+    url: str
+    in_flight: int = 0
+    # Set by a failed health check, cleared by a passing one
+    down_since: float | None = None
+    # Set by a failed generation. A passing health check doesn't clear it: a
+    # host can list its models on /api/tags and still stall on /api/chat.
+    failed_at: float | None = None
+
+
+class OllamaHostPool:
+    """Least-loaded routing across Ollama hosts with session affinity.
+
+    A host that fails a health check is skipped for `cooldown` seconds or
+    until a health check succeeds; one that fails a generation is skipped for
+    the full `cooldown`. If every host is down the least-loaded one is still
+    returned, so retries and the provider circuit breaker behave exactly as
+    with a single host.
+    """
+
+    def __init__(self, hosts: list[str], cooldown: float) -> None:
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._states = {url: _HostState(url) for url in hosts}
+        self._pinned: OrderedDict[str, str] = OrderedDict()
+
+    @property
+    def hosts(self) -> list[str]:
+        return list(self._states)
+
+    def acquire(self, session_id: str | None = None) -> str:
+        """Pick a host for one generation and count it as in flight."""
+        with self._lock:
+            now = time.monotonic()
+            up = [s for s in self._states.values() if not self._is_down(s, now)]
+            candidates = up or list(self._states.values())
+            chosen = min(candidates, key=lambda s: s.in_flight)
+
+            pinned = self._states.get(self._pinned.get(session_id, ""))
+            if (
+                pinned is not None
+                and pinned in candidates
+                and pinned.in_flight <= chosen.in_flight + _AFFINITY_SLACK
+            ):
+                chosen = pinned
+
+            chosen.in_flight += 1
+            if session_id is not None:
+                self._pin(session_id, chosen.url)
+            return chosen.url
+
+    def has_healthy_host(self) -> bool:
+        """Return whether any host is outside its cooldown."""
+        with self._lock:
+            now = time.monotonic()
+            return any(not self._is_down(s, now) for s in self._states.values())
+
+    def least_in_flight(self) -> int:
+        """Return the in-flight count of the least-loaded host that is up."""
+        with self._lock:
+            now = time.monotonic()
+            up = [s for s in self._states.values() if not self._is_down(s, now)]
+            return min(s.in_flight for s in up or self._states.values())
+
+    def release(self, host: str, failed: bool = False) -> None:
+        """Finish a generation started with `acquire`."""
+        with self._lock:
+            state = self._states[host]
+            state.in_flight -= 1
+            if failed:
+                state.failed_at = time.monotonic()
+
+    def mark_up(self, host: str) -> None:
+        with self._lock:
+            self._states[host].down_since = None
+
+    def mark_down(self, host: str) -> None:
+        with self._lock:
+            self._states[host].down_since = time.monotonic()
+
+    def _is_down(self, state: _HostState, now: float) -> bool:
+        return any(
+            since is not None and now - since < self.cooldown
+            for since in (state.down_since, state.failed_at)
+        )
+
+    def _pin(self, session_id: str, host: str) -> None:
+        self._pinned[session_id] = host
+        self._pinned.move_to_end(session_id)
+        if len(self._pinned) > _MAX_PINNED_SESSIONS:
+            self._pinned.popitem(last=False)
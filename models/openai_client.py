@@ -6,16 +6,26 @@ import openai
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from config import OPENAI
+from models.circuit_breaker import CircuitBreaker
+
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError,
+)
 
 _openai_retry = retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
-    retry=retry_if_exception_type(
-        (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError),
-    ),
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
     reraise=True,
 )
 
+OPENAI_BREAKER = CircuitBreaker(
+    "OpenAI API",
+    failure_threshold=OPENAI.circuit_failure_threshold,
+    reset_timeout=OPENAI.circuit_reset_timeout,
+    is_failure=lambda exc: isinstance(exc, _RETRYABLE_ERRORS),
+)
+
 
 @_openai_retry
 def _create_stream(client: openai.OpenAI, messages: list[dict[str, str]]):
@@ -49,8 +59,22 @@ def stream_openai_response(
         {"role": "user", "content": prompt},
     ]
 
-    response = _create_stream(client, messages)
+    yield from OPENAI_BREAKER.stream(_stream_text, client, messages)
+
 
-    for chunk in response:
-        if chunk.choices and chunk.choices[0].delta.content:
-            yield chunk.choices[0].delta.content
+def _stream_text(
+    client: openai.OpenAI, messages: list[dict[str, str]],
+) -> Generator[str, None, None]:
+    with _create_stream(client, messages) as response:
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except openai.APIError:
+            raise
+        except Exception as exc:
+            # A response that breaks off mid-stream may raise the HTTP
+            # client's own error; report it as the connection error it is.
+            raise openai.APIConnectionError(
+                message=f"Stream interrupted: {exc}", request=response.response.request,
+            ) from exc
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Generator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from constants import Tier3Model
+
+
+@dataclass(frozen=True)
+class PrefetchKey:
+    """Everything a prefetched response depends on; any change makes it stale."""
+
+    tier_num: int
+    prompt: str
+    system_prompt: str | None
+    tier3_model: Tier3Model
+
+
+class PrefetchedResponse:
+    """Drains a token stream on a background thread into a replayable buffer.
+
+    `stream()` yields whatever has been buffered so far, then follows the
+    producer live, so a send that arrives mid-prefetch still skips the wait
+    for the tokens already generated. `on_replayed` runs once a complete
+    response has been replayed, i.e. when someone actually saw it.
+    """
+
+    def __init__(
+        self,
+        key: PrefetchKey,
+        token_stream: Generator[str, None, None],
+        on_replayed: Callable[[PrefetchedResponse], None] | None = None,
+    ) -> None:
+        self.key = key
+        self.started_at = datetime.now(timezone.utc)
+        self.first_token_seconds: float | None = None
+        self.total_seconds = 0.0
+        self._started = time.perf_counter()
+        self._on_replayed = on_replayed
+        self._tokens: list[str] = []
+        self._done = False
+        self._error: BaseException | None = None
+        self._cancelled = threading.Event()
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._produce, args=(token_stream,), name="tier-prefetch", daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def failed(self) -> bool:
+        with self._changed:
+            return self._error is not None
+
+    @property
+    def tokens(self) -> list[str]:
+        with self._changed:
+            return list(self._tokens)
+
+    def cancel(self) -> None:
+        """Stop generating and discard the buffer."""
+        self._cancelled.set()
+
+    def stream(self) -> Generator[str, None, None]:
+        """Replay buffered tokens, then follow the producer until it finishes."""
+        sent = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: len(self._tokens) > sent or self._done)
+                pending = self._tokens[sent:]
+                done, error = self._done, self._error
+            yield from pending
+            sent += len(pending)
+            if done and sent == len(self._tokens):
+                if error is not None:
+                    raise error
+                if self._on_replayed is not None and not self._cancelled.is_set():
+                    self._on_replayed(self)
+                return
+
+    def _produce(self, token_stream: Generator[str, None, None]) -> None:
+        try:
+            for token in token_stream:
+                if self._cancelled.is_set():
+                    token_stream.close()
+                    break
+                with self._changed:
+                    if self.first_token_seconds is None:
+                        self.first_token_seconds = time.perf_counter() - self._started
+                    self._tokens.append(token)
+                    self._changed.notify_all()
+        except Exception as exc:
+            with self._changed:
+                self._error = exc
+        finally:
+            with self._changed:
+                self.total_seconds = time.perf_counter() - self._started
+                self._done = True
+                self._changed.notify_all()
@@ -0,0 +1,214 @@
+"""Sampling profiler for Streamlit reruns and token streams.
+
+One background thread samples the stacks of every profiled thread at a fixed
+interval. Each finished profile is written to the output directory as:
+
+- `<name>.folded`: collapsed stacks (`root;...;leaf count`), ready for
+  flamegraph.pl, speedscope or inferno
+- `<name>.json`: duration, tags and a per-function self/total sample summary
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Generator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Literal
+
+from config import PROFILE
+
+ProfileKind = Literal["rerun", "stream"]
+
+_SUMMARY_FUNCTIONS = 30
+
+
+@dataclass(frozen=True)
+class FunctionStats:
+    function: str
+    self_samples: int
+    total_samples: int
+
+
+@dataclass(frozen=True)
+class ProfileSummary:
+    kind: ProfileKind
+    tags: dict[str, str]
+    started_at: datetime
+    duration_seconds: float
+    samples: int
+    functions: list[FunctionStats]
+
+
+@dataclass(eq=False)
+class _ActiveProfile:
+    kind: ProfileKind
+    tags: dict[str, str]
+    thread_id: int
+    # Rerun profiles end once this frame is no longer on the thread's stack
+    until_frame: FrameType | None
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started: float = field(default_factory=time.perf_counter)
+    stacks: Counter[tuple[str, ...]] = field(default_factory=Counter)
+
+
+class SamplingProfiler:
+    def __init__(self, output_dir: Path, interval: float, recent_reruns: int) -> None:
+        self.output_dir = output_dir
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._has_active = threading.Event()
+        self._active: list[_ActiveProfile] = []
+        self._recent_reruns: deque[ProfileSummary] = deque(maxlen=recent_reruns)
+        self._labels: dict[CodeType, str] = {}
+        self._ids = itertools.count()
+        self._thread: threading.Thread | None = None
+
+    def profile_rerun(self, tags: dict[str, str]) -> None:
+        """Profile the calling script until its module frame finishes.
+
+        Call at the top level of the Streamlit script; reruns that end early
+        (st.rerun, st.stop, exceptions) are still closed out.
+        """
+        self._start(_ActiveProfile(
+            kind="rerun",
+            tags=tags,
+            thread_id=threading.get_ident(),
+            until_frame=sys._getframe(1),
+        ))
+
+    def profile_stream(
+        self, token_stream: Generator[str, None, None], tags: dict[str, str],
+    ) -> Generator[str, None, None]:
+        """Wrap a token stream so its consumption is profiled on the consuming thread."""
+        profile = _ActiveProfile(
+            kind="stream", tags=tags, thread_id=threading.get_ident(), until_frame=None,
+        )
+        self._start(profile)
+        try:
+            yield from token_stream
+        finally:
+            self._finish(profile)
+
+    def slowest_recent_reruns(self, limit: int = 10) -> list[ProfileSummary]:
+        with self._lock:
+            reruns = list(self._recent_reruns)
+        return sorted(reruns, key=lambda s: s.duration_seconds, reverse=True)[:limit]
+
+    def _start(self, profile: _ActiveProfile) -> None:
+        with self._lock:
+            self._active.append(profile)
+            if self._thread is None:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True,
+                )
+                self._thread.start()
+        self._has_active.set()
+
+    def _run(self) -> None:
+        while True:
+            self._has_active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._has_active.clear()
+                    continue
+            frames = sys._current_frames()
+            for profile in active:
+                frame = frames.get(profile.thread_id)
+                stack = self._stack(frame, profile.until_frame) if frame is not None else None
+                if stack is None:
+                    self._finish(profile)
+                else:
+                    profile.stacks[stack] += 1
+
+    def _stack(self, frame: FrameType, until_frame: FrameType | None) -> tuple[str, ...] | None:
+        # Returns None when `until_frame` has left the stack, i.e. the rerun ended.
+        labels: list[str] = []
+        found = until_frame is None
+        current: FrameType | None = frame
+        while current is not None:
+            found = found or current is until_frame
+            labels.append(self._label(current.f_code))
+            current = current.f_back
+        if not found:
+            return None
+        labels.reverse()
+        return tuple(labels)
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _finish(self, profile: _ActiveProfile) -> None:
+        with self._lock:
+            if profile not in self._active:
+                return
+            self._active.remove(profile)
+        profile.until_frame = None
+        summary = ProfileSummary(
+            kind=profile.kind,
+            tags=profile.tags,
+            started_at=profile.started_at,
+            duration_seconds=time.perf_counter() - profile.started,
+            samples=sum(profile.stacks.values()),
+            functions=_function_stats(profile.stacks),
+        )
+        if profile.kind == "rerun":
+            with self._lock:
+                self._recent_reruns.append(summary)
+        self._write(profile, summary)
+
+    def _write(self, profile: _ActiveProfile, summary: ProfileSummary) -> None:
+        tag_part = "-".join(f"{k}_{v}" for k, v in profile.tags.items())
+        stamp = profile.started_at.strftime("%Y%m%dT%H%M%S%fZ")
+        name = f"{stamp}-{profile.kind}-{tag_part}-{next(self._ids)}"
+        folded = "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in profile.stacks.items()
+        )
+        (self.output_dir / f"{name}.folded").write_text(folded, encoding="utf-8")
+        (self.output_dir / f"{name}.json").write_text(json.dumps({
+            "kind": summary.kind,
+            "tags": summary.tags,
+            "started_at": summary.started_at.isoformat(),
+            "duration_seconds": summary.duration_seconds,
+            "samples": summary.samples,
+            "interval_seconds": self.interval,
+            "functions": [
+                {"function": f.function, "self": f.self_samples, "total": f.total_samples}
+                for f in summary.functions
+            ],
+        }, indent=2), encoding="utf-8")
+
+
+def _function_stats(stacks: Counter[tuple[str, ...]]) -> list[FunctionStats]:
+    self_counts: Counter[str] = Counter()
+    total_counts: Counter[str] = Counter()
+    for stack, count in stacks.items():
+        self_counts[stack[-1]] += count
+        # Count recursive functions once per sample
+        for function in set(stack):
+            total_counts[function] += count
+    return [
+        FunctionStats(function, self_counts[function], total)
+        for function, total in total_counts.most_common(_SUMMARY_FUNCTIONS)
+    ]
+
+
+PROFILER = SamplingProfiler(
+    output_dir=PROFILE.directory,
+    interval=PROFILE.interval,
+    recent_reruns=PROFILE.recent_reruns,
+)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from collections import Counter, deque
+from dataclasses import dataclass
+
+_SHINGLE_SIZE = 4
+# One-permutation MinHash: each shingle hash lands in one of _NUM_BINS bins and
+# the bin keeps its minimum, so a signature costs one pass over the shingles.
+_NUM_BINS = 32
+# LSH banding: prompts sharing any band of _ROWS_PER_BAND bins become
+# candidates. 8 bands of 4 rows finds ~98% of pairs at Jaccard 0.8.
+_ROWS_PER_BAND = 4
+_EMPTY_BIN = -1
+_HASH_MASK = (1 << 64) - 1
+# Bounds on lookup work however many prompts share a bucket: each bucket
+# keeps its newest entries, and only the candidates sharing the most bands
+# with the query get an exact Jaccard check.
+_MAX_BUCKET_ENTRIES = 32
+_MAX_VERIFIED_CANDIDATES = 8
+
+# A word that only one of two prompts contains flips its meaning ("I have
+# not been...", "I don't want..."), however similar the rest of the text is.
+# Words are compared after normalization, so apostrophes are already gone.
+_NEGATIONS = frozenset({
+    "no", "not", "never", "none", "nobody", "nothing", "nowhere", "neither", "nor",
+    "without", "cannot", "cant", "dont", "doesnt", "didnt", "isnt", "arent", "wasnt",
+    "werent", "wont", "wouldnt", "shouldnt", "couldnt", "havent", "hasnt", "hadnt",
+    "aint", "mustnt", "neednt", "hardly", "barely",
+})
+# Self-harm and suicide vocabulary. One word can turn a harmless prompt into
+# a disclosure ("ending my lease" → "ending my life"), so a prompt that uses
+# any of these only reuses a response stored for exactly the same text.
+_RISK_TERMS = frozenset({
+    "die", "dies", "died", "dying", "dead", "death", "kill", "kills", "killed", "killing",
+    "suicide", "suicidal", "end", "ends", "ended", "ending", "life", "lives", "live",
+    "living", "alive", "hurt", "hurts", "hurting", "harm", "harming", "selfharm",
+    "overdose", "overdosed", "overdosing", "pills", "cut", "cuts", "cutting", "hang",
+    "hanging", "jump", "jumping", "gun", "weapon", "poison", "disappear", "gone",
+    "unalive", "kms", "kys",
+})
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class IndexMatch:
+    response: str
+    similarity: float
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, Unicode forms, punctuation and whitespace differences."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = _PUNCTUATION.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class ResponseIndex:
+    """Near-duplicate prompt lookup, scoped per tier, model and system prompt.
+
+    A stored prompt matches when its normalized text is identical, or when
+    the Jaccard similarity of its character shingles reaches `threshold`, the
+    two prompts don't differ by a negation and neither mentions self-harm or
+    suicide. A new prompt that already matches a stored one is merged into it
+    rather than stored again, and lookups touch a bounded number of LSH
+    candidates, so cost does not grow with the number of prompts seen.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._scopes: dict[tuple[int, str, str | None], _ScopeIndex] = {}
+
+    def add(
+        self, tier_num: int, model: str, system_prompt: str | None, prompt: str, response: str,
+    ) -> None:
+        scope = (tier_num, model, system_prompt)
+        with self._lock:
+            if scope not in self._scopes:
+                self._scopes[scope] = _ScopeIndex()
+            self._scopes[scope].add(prompt, response, self.threshold)
+
+    def lookup(
+        self, tier_num: int, model: str, system_prompt: str | None, prompt: str,
+    ) -> IndexMatch | None:
+        """Return the most similar stored prompt at or above the threshold."""
+        with self._lock:
+            scope_index = self._scopes.get((tier_num, model, system_prompt))
+            if scope_index is None:
+                return None
+            return scope_index.lookup(prompt, self.threshold)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(scope_index) for scope_index in self._scopes.values())
+
+
+@dataclass
+class _Entry:
+    response: str
+    words: frozenset[str]
+    shingles: frozenset[int]
+
+
+@dataclass(frozen=True)
+class _Query:
+    normalized: str
+    words: frozenset[str]
+    shingles: frozenset[int]
+    signature: tuple[int, ...]
+
+    @classmethod
+    def parse(cls, prompt: str) -> _Query:
+        normalized = normalize_prompt(prompt)
+        shingles = _shingles(normalized)
+        return cls(normalized, frozenset(normalized.split()), shingles, _signature(shingles))
+
+
+class _ScopeIndex:
+    def __init__(self) -> None:
+        self._entries: list[_Entry] = []
+        self._exact: dict[str, int] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], deque[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, prompt: str, response: str, threshold: float) -> None:
+        query = _Query.parse(prompt)
+        existing = self._exact.get(query.normalized)
+        if existing is not None:
+            # Same prompt generated again: keep the newest response
+            self._entries[existing].response = response
+            return
+        if self._best_match(query, threshold) is not None:
+            # Already answered by a near-duplicate; storing it too would only
+            # crowd that entry's buckets.
+            return
+
+        entry_id = len(self._entries)
+        self._entries.append(_Entry(response, query.words, query.shingles))
+        self._exact[query.normalized] = entry_id
+        if not query.words.isdisjoint(_RISK_TERMS):
+            return  # Exact matches only, so keep it out of the LSH buckets
+        for band_key in _band_keys(query.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is None:
+                bucket = self._buckets[band_key] = deque(maxlen=_MAX_BUCKET_ENTRIES)
+            bucket.append(entry_id)
+
+    def lookup(self, prompt: str, threshold: float) -> IndexMatch | None:
+        query = _Query.parse(prompt)
+        exact = self._exact.get(query.normalized)
+        if exact is not None:
+            return IndexMatch(self._entries[exact].response, 1.0)
+        best = self._best_match(query, threshold)
+        if best is None:
+            return None
+        entry, similarity = best
+        return IndexMatch(entry.response, similarity)
+
+    def _best_match(self, query: _Query, threshold: float) -> tuple[_Entry, float] | None:
+        if not query.words.isdisjoint(_RISK_TERMS):
+            return None
+        # Entries sharing more bands with the query have more similar signatures
+        shared_bands: Counter[int] = Counter()
+        for band_key in _band_keys(query.signature):
+            shared_bands.update(self._buckets.get(band_key, ()))
+
+        best: tuple[_Entry, float] | None = None
+        for entry_id, _ in shared_bands.most_common(_MAX_VERIFIED_CANDIDATES):
+            entry = self._entries[entry_id]
+            similarity = len(query.shingles & entry.shingles) / len(query.shingles | entry.shingles)
+            if (
+                similarity >= threshold
+                and (best is None or similarity > best[1])
+                and (query.words ^ entry.words).isdisjoint(_NEGATIONS)
+            ):
+                best = (entry, similarity)
+        return best
+
+
+def _shingles(normalized: str) -> frozenset[int]:
+    # Built-in str hashing is salted per process, which is fine for an
+    # in-memory index and much faster than a cryptographic hash.
+    if len(normalized) <= _SHINGLE_SIZE:
+        return frozenset({hash(normalized)})
+    return frozenset(
+        hash(normalized[i:i + _SHINGLE_SIZE])
+        for i in range(len(normalized) - _SHINGLE_SIZE + 1)
+    )
+
+
+def _signature(shingles: frozenset[int]) -> tuple[int, ...]:
+    bins = [_EMPTY_BIN] * _NUM_BINS
+    for shingle_hash in shingles:
+        shingle_hash &= _HASH_MASK
+        bin_index, value = shingle_hash % _NUM_BINS, shingle_hash // _NUM_BINS
+        if bins[bin_index] == _EMPTY_BIN or value < bins[bin_index]:
+            bins[bin_index] = value
+    return tuple(bins)
+
+
+def _band_keys(signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+    keys = []
+    for band in range(0, _NUM_BINS, _ROWS_PER_BAND):
+        rows = signature[band:band + _ROWS_PER_BAND]
+        # Bands with no shingles at all would lump every short prompt together
+        if any(row != _EMPTY_BIN for row in rows):
+            keys.append((band, rows))
+    return keys
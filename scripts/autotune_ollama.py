@@ -0,0 +1,183 @@
+"""Benchmark Ollama runtime options and save the fastest shared profile.
+
+Every combination of `num_ctx`, `num_thread` and `num_batch` runs each preset
+prompt under both Tier 1's (absent) and Tier 2's system prompt. Ollama reloads
+the model whenever any of these three options changes, so both tiers must
+share one set; otherwise every Tier 1 → Tier 2 send or prefetch would reload
+it. Prompt-eval and generation tokens/sec come from the stats Ollama returns
+with each response. The combination with the lowest expected time for a
+Tier 1 plus a Tier 2 request wins. It is written to `OLLAMA_PROFILE_PATH`,
+which `OllamaConfig` loads on startup.
+
+Run against the Ollama host you will present from:
+
+    python -m scripts.autotune_ollama --num-ctx 2048,4096 --num-thread 4,8 --num-batch 128,512
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+
+from config import OLLAMA, OllamaProfile
+from constants import PRESET_PROMPTS
+from prompts import TIER_1_SYSTEM_PROMPT, TIER_2_SYSTEM_PROMPT
+
+_TIER_SYSTEM_PROMPTS: dict[int, str | None] = {1: TIER_1_SYSTEM_PROMPT, 2: TIER_2_SYSTEM_PROMPT}
+_STAT_NAMES = ("prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    profile: OllamaProfile
+    prompt_tokens_per_second: float
+    generation_tokens_per_second: float
+    # Expected time of an average preset request, per tier
+    expected_seconds: dict[int, float]
+
+    @property
+    def score(self) -> float:
+        return sum(self.expected_seconds.values())
+
+
+def autotune(
+    host: str,
+    grid: dict[str, list[int]],
+    keep_alive: str,
+    repeats: int,
+) -> list[BenchmarkResult]:
+    """Benchmark every grid combination across both tiers, fastest first."""
+    results = []
+    for values in itertools.product(*grid.values()):
+        profile = OllamaProfile(
+            model=OLLAMA.model, **dict(zip(grid, values)), keep_alive=keep_alive,
+        )
+        result = benchmark_profile(host, profile, repeats)
+        if result is not None:
+            results.append(result)
+    if not results:
+        raise ValueError(
+            f"No num_ctx in {grid['num_ctx']} fits the preset prompts plus"
+            f" num_predict={OLLAMA.num_predict}; try larger values"
+        )
+    return sorted(results, key=lambda r: r.score)
+
+
+def benchmark_profile(host: str, profile: OllamaProfile, repeats: int) -> BenchmarkResult | None:
+    """Measure one combination, or return None if its context is too small."""
+    # The new options reload the model; keep that out of the numbers.
+    _chat(host, next(iter(PRESET_PROMPTS.values())), None, profile)
+
+    prompt_tokens = prompt_ns = generated_tokens = generation_ns = 0
+    tier_tokens = {tier_num: [0, 0] for tier_num in _TIER_SYSTEM_PROMPTS}
+    for _ in range(repeats):
+        for prompt in PRESET_PROMPTS.values():
+            # Alternate tiers as the demo does, so prompt-cache effects match
+            for tier_num, system_prompt in _TIER_SYSTEM_PROMPTS.items():
+                response = _chat(host, prompt, system_prompt, profile)
+                # Ollama omits zero-valued stats, e.g. prompt_eval_count on a cache hit
+                stats = {name: response.get(name, 0) for name in _STAT_NAMES}
+                if stats["prompt_eval_count"] + OLLAMA.num_predict > profile.num_ctx:
+                    return None
+                prompt_tokens += stats["prompt_eval_count"]
+                prompt_ns += stats["prompt_eval_duration"]
+                generated_tokens += stats["eval_count"]
+                generation_ns += stats["eval_duration"]
+                tier_tokens[tier_num][0] += stats["prompt_eval_count"]
+                tier_tokens[tier_num][1] += stats["eval_count"]
+
+    if generation_ns == 0:
+        raise ValueError(f"{host} returned no generation stats; is it an Ollama server?")
+    prompt_tps = prompt_tokens / (prompt_ns / 1e9) if prompt_ns else float("inf")
+    generation_tps = generated_tokens / (generation_ns / 1e9)
+    requests_per_tier = repeats * len(PRESET_PROMPTS)
+    expected_seconds = {
+        tier_num: (tier_prompt / prompt_tps + tier_generated / generation_tps) / requests_per_tier
+        for tier_num, (tier_prompt, tier_generated) in tier_tokens.items()
+    }
+    return BenchmarkResult(profile, prompt_tps, generation_tps, expected_seconds)
+
+
+def _chat(host: str, prompt: str, system_prompt: str | None, profile: OllamaProfile) -> dict:
+    messages = [{"role": "user", "content": prompt}]
+    if system_prompt is not None:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    resp = requests.post(
+        f"{host}/api/chat",
+        json={
+            "model": OLLAMA.model,
+            "messages": messages,
+            "stream": False,
+            "keep_alive": profile.keep_alive,
+            "options": {"num_predict": OLLAMA.num_predict, **profile.options()},
+        },
+        timeout=OLLAMA.timeout * 5,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    # The app reads the profile on startup; never let it see a partial file
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+def _parse_ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def _format_results(results: list[BenchmarkResult]) -> str:
+    lines = [
+        "Fastest first; T1/T2 are expected seconds per request",
+        f"  {'num_ctx':>7} {'threads':>7} {'batch':>5}"
+        f" {'prompt tok/s':>12} {'gen tok/s':>9} {'T1':>6} {'T2':>6}",
+    ]
+    for r in results:
+        lines.append(
+            f"  {r.profile.num_ctx:>7} {r.profile.num_thread:>7} {r.profile.num_batch:>5}"
+            f" {r.prompt_tokens_per_second:>12.1f} {r.generation_tokens_per_second:>9.1f}"
+            f" {r.expected_seconds[1]:>5.2f}s {r.expected_seconds[2]:>5.2f}s"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    cpu_count = os.cpu_count() or 4
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=OLLAMA.all_hosts[0])
+    parser.add_argument("--num-ctx", type=_parse_ints, default=[2048, 4096])
+    parser.add_argument(
+        "--num-thread",
+        type=_parse_ints,
+        default=sorted({max(cpu_count // 2, 1), cpu_count}),
+        help="Defaults to half and all of this machine's cores; set it for a remote host",
+    )
+    parser.add_argument("--num-batch", type=_parse_ints, default=[128, 512])
+    parser.add_argument("--keep-alive", default="30m", help="Saved with the profile as-is")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs of each preset per combination")
+    parser.add_argument("--output", type=Path, default=OLLAMA.profile_path)
+    args = parser.parse_args()
+
+    grid = {"num_ctx": args.num_ctx, "num_thread": args.num_thread, "num_batch": args.num_batch}
+    try:
+        results = autotune(args.host, grid, args.keep_alive, args.repeats)
+    except requests.RequestException as exc:
+        parser.exit(1, f"Benchmark request to {args.host} failed: {exc}\n")
+    except ValueError as exc:
+        parser.exit(1, f"{exc}\n")
+
+    best = results[0].profile
+    _write_atomically(args.output, best.model_dump_json(indent=2) + "\n")
+    print(_format_results(results))
+    print(f"\nSaved profile for {best.model} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Stand-in model providers for exercising the app without real inference.
+
+One server speaks enough of three APIs to drive every tier, emitting canned
+tokens at a fixed rate:
+
+- Ollama: `/api/tags` and `/api/chat` (streaming or not, with eval stats)
+- Anthropic: streaming `/v1/messages`
+- OpenAI: streaming `/v1/chat/completions`
+
+Run several on different ports to test multi-host Ollama routing, and point
+the API clients at one with their base-URL variables:
+
+    python -m scripts.fake_providers --port 11435 &
+    python -m scripts.fake_providers --port 11436 &
+    OLLAMA_HOSTS=http://localhost:11435,http://localhost:11436 \\
+    ANTHROPIC_BASE_URL=http://localhost:11435 ANTHROPIC_API_KEY=fake \\
+    OPENAI_BASE_URL=http://localhost:11435/v1 OPENAI_API_KEY=fake \\
+    streamlit run app.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import OLLAMA
+
+_REPLY = (
+    "It sounds like you're carrying a lot right now, and I'm glad you shared it."
+    " If any of this feels overwhelming, talking with someone you trust or a"
+    " professional can really help."
+)
+
+
+class _FakeProviderHandler(BaseHTTPRequestHandler):
+    server: FakeProviderServer
+
+    def do_GET(self) -> None:
+        if self.path != "/api/tags":
+            self.send_error(404)
+            return
+        self._send_json({"models": [{"name": self.server.model}]})
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/api/chat":
+            self._chat_ollama(payload)
+        elif self.path == "/v1/messages":
+            self._stream_anthropic(payload)
+        elif self.path == "/v1/chat/completions":
+            self._stream_openai(payload)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format: str, *args: object) -> None:
+        # Silence per-request access logs; they drown out load-test output.
+        pass
+
+    def _chat_ollama(self, payload: dict) -> None:
+        num_predict = payload.get("options", {}).get("num_predict", OLLAMA.num_predict)
+        prompt_eval_count = len(json.dumps(payload["messages"])) // 4
+        started = time.perf_counter()
+        if not payload.get("stream", True):
+            content = "".join(self._tokens(num_predict))
+            self._send_json(self._ollama_final_chunk(
+                content, prompt_eval_count, len(content.split()), started,
+            ))
+            return
+
+        self._start_stream("application/x-ndjson")
+        eval_count = 0
+        try:
+            for token in self._tokens(num_predict):
+                eval_count += 1
+                self._write(json.dumps(
+                    {"message": {"role": "assistant", "content": token}, "done": False},
+                ) + "\n")
+            self._write(json.dumps(
+                self._ollama_final_chunk("", prompt_eval_count, eval_count, started),
+            ) + "\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled the generation
+
+    def _ollama_final_chunk(
+        self, content: str, prompt_eval_count: int, eval_count: int, started: float,
+    ) -> dict:
+        return {
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "prompt_eval_count": prompt_eval_count,
+            # Pretend prompt evaluation runs ten times faster than generation
+            "prompt_eval_duration": int(prompt_eval_count * self.server.token_delay / 10 * 1e9),
+            "eval_count": eval_count,
+            "eval_duration": int((time.perf_counter() - started) * 1e9),
+        }
+
+    def _stream_anthropic(self, payload: dict) -> None:
+        self._start_stream("text/event-stream")
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        try:
+            self._write_sse("message_start", {"type": "message_start", "message": {
+                "id": "msg_fake", "type": "message", "role": "assistant",
+                "content": [], "model": payload["model"], "stop_reason": None,
+                "stop_sequence": None, "usage": usage,
+            }})
+            self._write_sse("content_block_start", {
+                "type": "content_block_start", "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            })
+            for token in self._tokens(payload["max_tokens"]):
+                self._write_sse("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": token},
+                })
+            self._write_sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            self._write_sse("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": 0},
+            })
+            self._write_sse("message_stop", {"type": "message_stop"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stream_openai(self, payload: dict) -> None:
+        self._start_stream("text/event-stream")
+        try:
+            for token in self._tokens(payload.get("max_completion_tokens", 400)):
+                self._write_sse(None, {
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": payload["model"],
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                })
+            self._write("data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _tokens(self, limit: int) -> Iterator[str]:
+        for word in _REPLY.split()[:limit]:
+            time.sleep(self.server.token_delay)
+            yield f"{word} "
+
+    def _send_json(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+
+    def _write_sse(self, event: str | None, data: dict) -> None:
+        prefix = f"event: {event}\n" if event else ""
+        self._write(f"{prefix}data: {json.dumps(data)}\n\n")
+
+    def _write(self, text: str) -> None:
+        self.wfile.write(text.encode("utf-8"))
+        self.wfile.flush()
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, port: int, model: str, token_delay: float) -> None:
+        super().__init__(("127.0.0.1", port), _FakeProviderHandler)
+        self.model = model
+        self.token_delay = token_delay
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--model", default=OLLAMA.model)
+    parser.add_argument(
+        "--token-delay", type=float, default=0.02, help="Seconds between streamed tokens",
+    )
+    args = parser.parse_args()
+
+    server = FakeProviderServer(args.port, args.model, args.token_delay)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
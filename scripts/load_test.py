@@ -0,0 +1,350 @@
+"""Concurrent-session load test for one `streamlit run app.py` server.
+
+Starts stand-in providers and a real Streamlit server, then connects N
+websocket sessions to that one process (see `scripts.streamlit_session`), so
+they share its GIL, event loop and module-level Ollama pool, circuit breakers
+and caches as attendees' browsers do. Each session loads the page, then for
+every round clicks a preset, sends to Tiers 1 and 2, sends to Tier 3 with
+Claude, switches to GPT and sends again, and switches back. Results are
+reported per session count:
+
+- rerun latency percentiles for interactions that don't stream
+- send latency and render lag, the time a send takes beyond the same send
+  made by one session alone on the same server
+- the server's RSS growth and CPU time per session (Linux only, from /proc)
+- sessions that raised or timed out, with the reason
+
+Each session count gets a fresh server. Prefetch, response reuse, profiling
+and the archive are turned off so every send generates. Run with:
+
+    python -m scripts.load_test --sessions 1,5,10,20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import requests
+
+from constants import PRESET_PROMPTS
+from scripts.streamlit_session import StreamlitSession
+
+_PROJECT_DIR = Path(__file__).resolve().parent.parent
+_APP_PATH = str(_PROJECT_DIR / "app.py")
+_HOST = "127.0.0.1"
+_MODEL_RADIO = "Select model"
+_RADIO_LABELS = {"claude": "Claude Sonnet 4.5", "gpt": "GPT-5.2"}
+# Longest a session waits for one rerun before it counts as timed out
+_RUN_TIMEOUT = 120.0
+# Script runs per round: a preset click, four sends and two model switches
+_RUNS_PER_ROUND = 7
+_STARTUP_TIMEOUT = 30.0
+_SAMPLE_INTERVAL = 0.1
+
+
+@dataclass
+class SessionResult:
+    index: int
+    # Why the session didn't finish, if it didn't
+    failure: str | None = None
+    rerun_seconds: list[float] = field(default_factory=list)
+    send_seconds: list[float] = field(default_factory=list)
+    render_lag_seconds: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+@dataclass
+class RunResult:
+    sessions: list[SessionResult]
+    # Growth of the server process while the sessions ran; None off Linux
+    rss_delta_kb: int | None
+    cpu_seconds: float | None
+
+
+def run_load_test(
+    session_counts: list[int], rounds: int, port: int, app_port: int, token_delay: float,
+) -> dict[int, RunResult]:
+    """Start stand-in providers, then run each session count against a fresh server."""
+    env = {
+        **os.environ,
+        "OLLAMA_HOST": f"http://{_HOST}:{port}",
+        "OLLAMA_HOSTS": "",
+        "ANTHROPIC_BASE_URL": f"http://{_HOST}:{port}",
+        "ANTHROPIC_API_KEY": "fake",
+        "OPENAI_BASE_URL": f"http://{_HOST}:{port}/v1",
+        "OPENAI_API_KEY": "fake",
+        # A presenter's .env may turn these on; each would skew every figure
+        "ARCHIVE_ENABLED": "false",
+        "PREFETCH_ENABLED": "false",
+        "REUSE_ENABLED": "false",
+        "PROFILE_ENABLED": "false",
+    }
+    providers = subprocess.Popen(
+        [sys.executable, "-m", "scripts.fake_providers",
+         "--port", str(port), "--token-delay", str(token_delay)],
+        cwd=_PROJECT_DIR,
+        env=env,
+    )
+    try:
+        _wait_until_ready(f"http://{_HOST}:{port}/api/tags", providers, "Stand-in providers")
+        return {n: _run_with_server(n, rounds, app_port, env) for n in session_counts}
+    finally:
+        _stop(providers)
+
+
+def _run_with_server(count: int, rounds: int, port: int, env: dict[str, str]) -> RunResult:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", _APP_PATH,
+         "--server.headless=true", f"--server.port={port}", f"--server.address={_HOST}",
+         "--server.fileWatcherType=none", "--browser.gatherUsageStats=false"],
+        cwd=_PROJECT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_ready(f"http://{_HOST}:{port}/_stcore/health", server, "Streamlit")
+        # One session alone warms the server and sets the unloaded send times
+        baselines = _measure_baselines(port)
+        sampler = _ServerSampler(server.pid)
+        sampler.start()
+        sessions = _run_sessions(count, rounds, port, baselines)
+        sampler.stop()
+        return RunResult(sessions, sampler.rss_delta_kb, sampler.cpu_seconds)
+    finally:
+        _stop(server)
+
+
+def _wait_until_ready(url: str, process: subprocess.Popen, name: str) -> None:
+    deadline = time.monotonic() + _STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with code {process.returncode}")
+        try:
+            requests.get(url, timeout=1.0).raise_for_status()
+            return
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError(f"{name} did not answer on {url}")
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _measure_baselines(port: int) -> dict[str, float]:
+    with StreamlitSession(_HOST, port, _RUN_TIMEOUT) as session:
+        session.load()
+        return {
+            send: seconds
+            for send, seconds in _play_round(session, next(iter(PRESET_PROMPTS)))
+            if send is not None
+        }
+
+
+def _run_sessions(
+    count: int, rounds: int, port: int, baselines: dict[str, float],
+) -> list[SessionResult]:
+    results = [SessionResult(index=i) for i in range(count)]
+    connected = [threading.Event() for _ in range(count)]
+    start = threading.Event()
+    workers = [
+        threading.Thread(
+            target=_simulate_session,
+            args=(results[i], rounds, port, baselines, connected[i], start),
+            name=f"session-{i}",
+            daemon=True,
+        )
+        for i in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    # Sessions set `connected` even if they fail to connect
+    deadline = time.monotonic() + _STARTUP_TIMEOUT
+    for event in connected:
+        event.wait(max(deadline - time.monotonic(), 0))
+    start.set()
+
+    # Socket reads time out after _RUN_TIMEOUT, so this only catches sessions
+    # whose reruns each finish just in time but never stop
+    deadline = time.monotonic() + _RUN_TIMEOUT * (1 + _RUNS_PER_ROUND * rounds)
+    for worker, result in zip(workers, results):
+        worker.join(max(deadline - time.monotonic(), 0))
+        if worker.is_alive() and result.failure is None:
+            result.failure = "timed out"
+    return results
+
+
+def _simulate_session(
+    result: SessionResult,
+    rounds: int,
+    port: int,
+    baselines: dict[str, float],
+    connected: threading.Event,
+    start: threading.Event,
+) -> None:
+    try:
+        try:
+            session = StreamlitSession(_HOST, port, _RUN_TIMEOUT)
+        finally:
+            # Set even on failure, so one broken session can't hold up the rest
+            connected.set()
+        start.wait()
+        with session:
+            result.rerun_seconds.append(session.load())
+            presets = list(PRESET_PROMPTS)
+            for round_num in range(rounds):
+                preset = presets[(result.index + round_num) % len(presets)]
+                for send, seconds in _play_round(session, preset):
+                    if send is None:
+                        result.rerun_seconds.append(seconds)
+                    else:
+                        result.send_seconds.append(seconds)
+                        result.render_lag_seconds.append(max(seconds - baselines[send], 0.0))
+            result.errors = session.errors
+    except Exception as exc:
+        if result.failure is None:
+            result.failure = f"{type(exc).__name__}: {exc}"
+
+
+def _play_round(session: StreamlitSession, preset: str) -> Iterator[tuple[str | None, float]]:
+    """Yield each run's send name (None for a plain rerun) and duration."""
+    yield None, session.click(preset)
+    yield "tier1", session.click("send_t1")
+    yield "tier2", session.click("send_t2")
+    yield "tier3-claude", session.click("send_t3")
+    yield None, session.select(_MODEL_RADIO, _RADIO_LABELS["gpt"])
+    yield "tier3-gpt", session.click("send_t3")
+    yield None, session.select(_MODEL_RADIO, _RADIO_LABELS["claude"])
+
+
+class _ServerSampler:
+    """Samples a process's RSS and CPU time from /proc until stopped."""
+
+    def __init__(self, pid: int) -> None:
+        self._pid = pid
+        self._stopped = threading.Event()
+        self._rss_before = _read_rss_kb(pid)
+        self._cpu_before = _read_cpu_seconds(pid)
+        self._peak_rss = self._rss_before
+        self._thread = threading.Thread(target=self._sample, name="server-sampler", daemon=True)
+        self.rss_delta_kb: int | None = None
+        self.cpu_seconds: float | None = None
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        cpu_after = _read_cpu_seconds(self._pid)
+        if self._rss_before is not None and self._peak_rss is not None:
+            self.rss_delta_kb = self._peak_rss - self._rss_before
+        if self._cpu_before is not None and cpu_after is not None:
+            self.cpu_seconds = cpu_after - self._cpu_before
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(_SAMPLE_INTERVAL):
+            rss = _read_rss_kb(self._pid)
+            if rss is not None and self._peak_rss is not None:
+                self._peak_rss = max(self._peak_rss, rss)
+
+
+def _read_rss_kb(pid: int) -> int | None:
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return None
+
+
+def _read_cpu_seconds(pid: int) -> float | None:
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    # utime and stime are fields 14 and 15; the command name before ")" may contain spaces
+    utime, stime = stat.rsplit(")", 1)[1].split()[11:13]
+    return (int(utime) + int(stime)) / os.sysconf("SC_CLK_TCK")
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def _format_report(results: dict[int, RunResult]) -> str:
+    header = (
+        f"{'sessions':>8} {'rerun p50':>10} {'p95':>8} {'p99':>8}"
+        f" {'send p50':>9} {'p95':>8} {'lag p50':>8} {'p95':>8}"
+        f" {'RSS/sess':>9} {'CPU/sess':>9} {'errors':>6} {'failed':>6}"
+    )
+    lines = [
+        "RSS/sess and CPU/sess are the server process's growth divided by sessions",
+        header,
+        "-" * len(header),
+    ]
+    failures = []
+    for count, run in results.items():
+        finished = [r for r in run.sessions if r.failure is None]
+        failed = len(run.sessions) - len(finished)
+        failures.extend(
+            f"{count} sessions, session {r.index}: {r.failure}" for r in run.sessions if r.failure
+        )
+        if not finished:
+            lines.append(f"{count:>8} {'all sessions failed':>88} {failed:>6}")
+            continue
+        reruns = [s for r in finished for s in r.rerun_seconds]
+        sends = [s for r in finished for s in r.send_seconds]
+        lags = [s for r in finished for s in r.render_lag_seconds]
+        rss_mb = None if run.rss_delta_kb is None else run.rss_delta_kb / 1024 / count
+        rss = f"{'n/a':>9}" if rss_mb is None else f"{rss_mb:>7.1f}MB"
+        cpu = f"{'n/a':>9}" if run.cpu_seconds is None else f"{run.cpu_seconds / count:>8.2f}s"
+        lines.append(
+            f"{count:>8}"
+            f" {_percentile(reruns, 50) * 1000:>8.0f}ms {_percentile(reruns, 95) * 1000:>6.0f}ms"
+            f" {_percentile(reruns, 99) * 1000:>6.0f}ms"
+            f" {_percentile(sends, 50) * 1000:>7.0f}ms {_percentile(sends, 95) * 1000:>6.0f}ms"
+            f" {_percentile(lags, 50) * 1000:>6.0f}ms {_percentile(lags, 95) * 1000:>6.0f}ms"
+            f" {rss} {cpu} {sum(r.errors for r in finished):>6} {failed:>6}"
+        )
+    if failures:
+        lines.extend(["", "Failed sessions:", *failures])
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test app.py with concurrent sessions.")
+    parser.add_argument(
+        "--sessions", default="1,5,10", help="Comma-separated session counts to run in turn",
+    )
+    parser.add_argument("--rounds", type=int, default=1, help="Preset/send cycles per session")
+    parser.add_argument("--port", type=int, default=11499, help="Port for stand-in providers")
+    parser.add_argument("--app-port", type=int, default=8599, help="Port for the Streamlit server")
+    parser.add_argument(
+        "--token-delay", type=float, default=0.02, help="Seconds between stand-in tokens",
+    )
+    args = parser.parse_args()
+
+    session_counts = [int(n) for n in args.sessions.split(",")]
+    results = run_load_test(session_counts, args.rounds, args.port, args.app_port, args.token_delay)
+    print(_format_report(results))
+
+
+if __name__ == "__main__":
+    main()
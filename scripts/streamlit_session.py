@@ -0,0 +1,196 @@
+"""A headless browser tab for a running `streamlit run` server.
+
+Speaks Streamlit's websocket protocol directly: each rerun sends a `BackMsg`
+with the widget that changed, then reads `ForwardMsg` deltas until the script
+finishes. Widget ids are taken from the elements the server renders, the same
+way the frontend finds them, so sessions click buttons by label or key and
+pick radio options by label.
+
+The websocket client is a minimal RFC 6455 implementation over a socket, so
+it works whichever web server the installed Streamlit uses.
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import socket
+import struct
+import time
+
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.Radio_pb2 import Radio
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+_OPCODE_BINARY = 0x2
+_OPCODE_CLOSE = 0x8
+_OPCODE_PING = 0x9
+_OPCODE_PONG = 0xA
+# Newer Streamlit versions send a radio's value as the option's label rather
+# than its index; they added `raw_value` to the proto in the same change.
+_RADIO_SENDS_LABEL = "raw_value" in Radio.DESCRIPTOR.fields_by_name
+
+
+class StreamlitSession:
+    """One websocket session; every call blocks until its rerun finishes.
+
+    `timeout` bounds each socket read, so a server that stops answering
+    raises `TimeoutError` rather than hanging the caller.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self._socket = _WebSocket(host, port, "/_stcore/stream", timeout)
+        self._buttons: dict[str, str] = {}
+        self._radios: dict[str, tuple[str, list[str]]] = {}
+        self.errors = 0
+
+    def __enter__(self) -> StreamlitSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def load(self) -> float:
+        """Run the script as a new page load; return its duration in seconds."""
+        return self._rerun(None)
+
+    def click(self, label_or_key: str) -> float:
+        """Click the button with this label or key; return the rerun's duration."""
+        widget_id = self._buttons.get(label_or_key)
+        if widget_id is None:
+            raise LookupError(f"No button {label_or_key!r} in the last run")
+        return self._rerun(WidgetState(id=widget_id, trigger_value=True))
+
+    def select(self, radio_label: str, option: str) -> float:
+        """Choose `option` in the radio labelled `radio_label`."""
+        if radio_label not in self._radios:
+            raise LookupError(f"No radio {radio_label!r} in the last run")
+        widget_id, options = self._radios[radio_label]
+        if _RADIO_SENDS_LABEL:
+            return self._rerun(WidgetState(id=widget_id, string_value=option))
+        return self._rerun(WidgetState(id=widget_id, int_value=options.index(option)))
+
+    def radio_labels(self) -> list[str]:
+        return list(self._radios)
+
+    def _rerun(self, changed: WidgetState | None) -> float:
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        if changed is not None:
+            # The server keeps every other widget's previous value
+            msg.rerun_script.widget_states.widgets.append(changed)
+
+        started = time.perf_counter()
+        self._socket.send(msg.SerializeToString())
+        self._buttons, self._radios, self.errors = {}, {}, 0
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(self._socket.receive())
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                self._track_element(forward)
+            elif kind == "new_session":
+                # A script run triggered by `st.rerun()` renders everything again
+                self._buttons, self._radios, self.errors = {}, {}, 0
+            elif kind == "script_finished":
+                status = forward.script_finished
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("The app script failed to compile")
+                if status != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - started
+
+    def _track_element(self, forward: ForwardMsg) -> None:
+        if forward.delta.WhichOneof("type") != "new_element":
+            return
+        element = forward.delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "button":
+            self._buttons[element.button.label] = element.button.id
+            # Keyed widget ids end in "-<key>", unkeyed ones in "-None"
+            key = element.button.id.rsplit("-", 1)[-1]
+            if key != "None":
+                self._buttons[key] = element.button.id
+        elif kind == "radio":
+            self._radios[element.radio.label] = (element.radio.id, list(element.radio.options))
+        elif kind == "exception" or (kind == "alert" and element.alert.format == Alert.ERROR):
+            self.errors += 1
+
+
+class _WebSocket:
+    def __init__(self, host: str, port: int, path: str, timeout: float) -> None:
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._socket.makefile("rb")
+        key = base64.b64encode(os.urandom(16)).decode()
+        self._socket.sendall(
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n"
+            "Sec-WebSocket-Protocol: streamlit\r\n"
+            "\r\n".encode()
+        )
+        status = self._reader.readline()
+        if status.split(b" ", 2)[1:2] != [b"101"]:
+            raise ConnectionError(f"Websocket upgrade refused: {status.decode().strip()}")
+        while self._reader.readline() not in (b"\r\n", b""):
+            pass
+
+    def send(self, payload: bytes, opcode: int = _OPCODE_BINARY) -> None:
+        # Client frames must be masked (RFC 6455 §5.3)
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 1 << 16:
+            header += bytes([0x80 | 126]) + struct.pack("!H", length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", length)
+        mask = os.urandom(4)
+        repeated = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(
+            length, "big",
+        )
+        self._socket.sendall(header + mask + masked)
+
+    def receive(self) -> bytes:
+        """Return the next complete data message, answering pings on the way."""
+        fragments: list[bytes] = []
+        while True:
+            first, second = self._read(2)
+            length = second & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", self._read(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", self._read(8))
+            payload = self._read(length)
+            opcode = first & 0x0F
+            if opcode == _OPCODE_PING:
+                self.send(payload, _OPCODE_PONG)
+            elif opcode == _OPCODE_CLOSE:
+                raise ConnectionError("Server closed the websocket")
+            elif opcode != _OPCODE_PONG:
+                fragments.append(payload)
+                if first & 0x80:
+                    return b"".join(fragments)
+
+    def close(self) -> None:
+        try:
+            self.send(b"", _OPCODE_CLOSE)
+        except OSError:
+            pass  # Already gone
+        self._reader.close()
+        self._socket.close()
+
+    def _read(self, size: int) -> bytes:
+        data = self._reader.read(size)
+        if len(data) < size:
+            raise ConnectionError("Websocket closed mid-frame")
+        return data
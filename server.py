@@ -0,0 +1,187 @@
+"""Headless HTTP API over the tier backend, streaming with Server-Sent Events.
+
+Endpoints:
+
+    GET  /health   Startup status from `validate_startup` (503 if no tier can run)
+    GET  /stream   Query params: tier, prompt, tier3_model, system_prompt, session_id
+    POST /stream   Same fields as a JSON body (at most 64 KiB)
+
+`/stream` emits `token` events with `{"text": ...}`, then one `done` event, or
+an `error` event if the provider fails. Run with:
+
+    python -m server --port 8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import anthropic
+import openai
+import requests
+from pydantic import BaseModel, Field, ValidationError
+
+from backend import has_api_key, stream_tier_response, validate_startup
+from constants import Tier3Model
+from models.circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+_PROVIDER_ERRORS = (
+    CircuitOpenError, requests.RequestException, anthropic.APIError, openai.APIError,
+)
+# Far more than any prompt needs; larger bodies are refused before being read
+_MAX_BODY_BYTES = 64 * 1024
+
+
+class StreamRequest(BaseModel):
+    tier: int = Field(ge=1, le=3)
+    prompt: str = Field(min_length=1)
+    tier3_model: Tier3Model = "claude"
+    system_prompt: str | None = None
+    session_id: str | None = None
+
+
+class _TierStreamHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send_health()
+        elif url.path == "/stream":
+            self._handle_stream(dict(parse_qsl(url.query)))
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {url.path}"})
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/stream":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length header"})
+            return
+        if length > _MAX_BODY_BYTES:
+            self._send_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                {"error": f"Request body exceeds {_MAX_BODY_BYTES} bytes"},
+            )
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as exc:
+            # Covers malformed JSON and bodies that aren't valid UTF-8
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON body: {exc}"})
+            return
+        self._handle_stream(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def _send_health(self) -> None:
+        status = validate_startup()
+        can_serve = (
+            status.ollama_available
+            or status.tier3_available("claude")
+            or status.tier3_available("gpt")
+        )
+        self._send_json(
+            HTTPStatus.OK if can_serve else HTTPStatus.SERVICE_UNAVAILABLE,
+            {
+                "ollama_available": status.ollama_available,
+                "claude_available": status.tier3_available("claude"),
+                "gpt_available": status.tier3_available("gpt"),
+                "warnings": status.warnings,
+            },
+        )
+
+    def _handle_stream(self, params: dict) -> None:
+        try:
+            stream_request = StreamRequest.model_validate(params)
+        except ValidationError as exc:
+            self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": exc.errors()})
+            return
+        if stream_request.tier == 3 and not has_api_key(stream_request.tier3_model):
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": f"No API key configured for {stream_request.tier3_model}"},
+            )
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+
+        token_stream = stream_tier_response(
+            stream_request.tier,
+            stream_request.prompt,
+            stream_request.tier3_model,
+            system_prompt=stream_request.system_prompt,
+            session_id=stream_request.session_id,
+        )
+        chars = 0
+        try:
+            for token in token_stream:
+                chars += len(token)
+                self._send_event("token", {"text": token})
+            self._send_event("done", {"chars": chars})
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away; closing the generator releases the provider stream.
+            token_stream.close()
+        except _PROVIDER_ERRORS as exc:
+            self._send_event("error", {"message": str(exc)})
+        except Exception:
+            # e.g. a malformed chunk from a provider; the client still needs a terminal event
+            logger.exception("Tier %d stream failed", stream_request.tier)
+            self._send_event("error", {"message": "Internal error while streaming"})
+
+    def _send_event(self, event: str, data: dict) -> None:
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_json(self, status: HTTPStatus, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TierStreamServer(ThreadingHTTPServer):
+    """One thread per connection; provider clients block on I/O, not CPU."""
+
+    daemon_threads = True
+    # Default listen backlog is 5, far too small for a burst of load-test clients.
+    request_queue_size = 256
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__((host, port), _TierStreamHandler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the tier backend over SSE.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = TierStreamServer(args.host, args.port)
+    logger.info("Serving tier streams on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
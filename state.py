@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, fields
+from dataclasses import dataclass, field, fields
+from uuid import uuid4
 
 import streamlit as st
 
 from constants import Tier3Model
+from prefetch import PrefetchedResponse
 from prompts import TIER_2_SYSTEM_PROMPT, TIER_3_SYSTEM_PROMPT
 
 
@@ -19,6 +21,10 @@ class AppState:
     tier3_selected_model: Tier3Model = "claude"
     tier2_system_prompt: str = TIER_2_SYSTEM_PROMPT
     tier3_system_prompt: str = TIER_3_SYSTEM_PROMPT
+    session_id: str = field(default_factory=lambda: uuid4().hex)
+    prefetched: PrefetchedResponse | None = None
+    # Response key (e.g. "tier1_response") -> label for responses served from the reuse index
+    reused_from: dict[str, str] = field(default_factory=dict)
 
 
 def init_state() -> None:
@@ -40,3 +46,4 @@ def clear_responses() -> None:
     st.session_state.tier2_response = None
     st.session_state.tier3_claude_response = None
     st.session_state.tier3_gpt_response = None
+    st.session_state.reused_from = {}
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+
+from models import circuit_breaker
+from models.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+RESET_TIMEOUT = 30.0
+
+
+class ProviderDown(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock: _Clock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "Test provider",
+        failure_threshold=3,
+        reset_timeout=RESET_TIMEOUT,
+        is_failure=lambda exc: isinstance(exc, ProviderDown),
+    )
+
+
+def _fail(exc: Exception) -> None:
+    raise exc
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ProviderDown):
+            breaker.call(_fail, ProviderDown())
+
+
+def _stream(tokens: list[str], exc: Exception | None = None) -> Iterator[str]:
+    yield from tokens
+    if exc is not None:
+        raise exc
+
+
+def test_call_opens_after_threshold_then_probes_and_closes(
+    breaker: CircuitBreaker, clock: _Clock,
+) -> None:
+    _trip(breaker)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "unreachable")
+
+    clock.now += RESET_TIMEOUT
+    assert breaker.state == "half_open"
+    assert breaker.call(lambda: "ok") == "ok"
+
+    assert breaker.state == "closed"
+
+
+def test_call_below_threshold_stays_closed(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold - 1):
+        with pytest.raises(ProviderDown):
+            breaker.call(_fail, ProviderDown())
+
+    assert breaker.state == "closed"
+
+
+def test_call_success_resets_failure_count(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold - 1):
+        with pytest.raises(ProviderDown):
+            breaker.call(_fail, ProviderDown())
+    breaker.call(lambda: None)
+
+    with pytest.raises(ProviderDown):
+        breaker.call(_fail, ProviderDown())
+
+    assert breaker.state == "closed"
+
+
+def test_call_failed_probe_reopens(breaker: CircuitBreaker, clock: _Clock) -> None:
+    _trip(breaker)
+    clock.now += RESET_TIMEOUT
+
+    with pytest.raises(ProviderDown):
+        breaker.call(_fail, ProviderDown())
+
+    assert breaker.state == "open"
+    assert breaker.retry_after == pytest.approx(RESET_TIMEOUT)
+
+
+def test_call_half_open_allows_one_probe_at_a_time(
+    breaker: CircuitBreaker, clock: _Clock,
+) -> None:
+    _trip(breaker)
+    clock.now += RESET_TIMEOUT
+    probe = breaker.stream(_stream, ["a"])
+    next(probe)
+
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: None)
+    probe.close()
+
+
+def test_call_non_counting_exception_does_not_trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold * 2):
+        with pytest.raises(BadRequest):
+            breaker.call(_fail, BadRequest())
+
+    assert breaker.state == "closed"
+
+
+def test_call_non_counting_exception_keeps_circuit_half_open(
+    breaker: CircuitBreaker, clock: _Clock,
+) -> None:
+    _trip(breaker)
+    clock.now += RESET_TIMEOUT
+
+    with pytest.raises(BadRequest):
+        breaker.call(_fail, BadRequest())
+
+    assert breaker.state == "half_open"
+
+
+def test_stream_failure_mid_response_counts(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ProviderDown):
+            list(breaker.stream(_stream, ["a", "b"], ProviderDown()))
+
+    assert breaker.state == "open"
+
+
+def test_stream_closed_early_counts_as_success(breaker: CircuitBreaker, clock: _Clock) -> None:
+    _trip(breaker)
+    clock.now += RESET_TIMEOUT
+
+    stream = breaker.stream(_stream, ["a", "b"])
+    assert next(stream) == "a"
+    stream.close()
+
+    assert breaker.state == "closed"
+
+
+def test_reset_closes_open_circuit(breaker: CircuitBreaker) -> None:
+    _trip(breaker)
+
+    breaker.reset()
+
+    assert breaker.state == "closed"
+    assert breaker.retry_after == 0.0
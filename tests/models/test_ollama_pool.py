@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import pytest
+
+from models import ollama_pool
+from models.ollama_pool import OllamaHostPool
+
+HOST_A, HOST_B = "http://a:11434", "http://b:11434"
+COOLDOWN = 15.0
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(ollama_pool.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def pool(clock: _Clock) -> OllamaHostPool:
+    return OllamaHostPool([HOST_A, HOST_B], cooldown=COOLDOWN)
+
+
+def test_release_failed_skips_host_despite_passing_health_check(pool: OllamaHostPool) -> None:
+    pool.release(pool.acquire(), failed=True)
+
+    pool.mark_up(HOST_A)
+
+    assert pool.acquire() == HOST_B
+    assert pool.acquire() == HOST_B
+
+
+def test_release_failed_host_returns_after_cooldown(pool: OllamaHostPool, clock: _Clock) -> None:
+    pool.release(pool.acquire(), failed=True)
+
+    clock.now += COOLDOWN
+
+    assert pool.acquire() == HOST_A
+
+
+def test_mark_up_clears_failed_health_check(pool: OllamaHostPool) -> None:
+    pool.mark_down(HOST_A)
+    pool.mark_up(HOST_A)
+
+    assert pool.acquire() == HOST_A
+
+
+def test_has_healthy_host_false_once_every_host_failed(pool: OllamaHostPool) -> None:
+    pool.release(pool.acquire(), failed=True)
+    assert pool.has_healthy_host()
+
+    pool.mark_down(HOST_B)
+
+    assert not pool.has_healthy_host()
+
+
+def test_acquire_picks_least_loaded_host(pool: OllamaHostPool) -> None:
+    assert pool.acquire() == HOST_A
+
+    assert pool.acquire() == HOST_B
+
+
+def test_acquire_keeps_session_on_pinned_host_within_slack(pool: OllamaHostPool) -> None:
+    assert pool.acquire("session") == HOST_A
+
+    # HOST_A is one generation busier than HOST_B, which the slack allows
+    assert pool.acquire("session") == HOST_A
+
+
+def test_acquire_moves_session_when_pinned_host_exceeds_slack(pool: OllamaHostPool) -> None:
+    pool.acquire("session")
+    pool.acquire("session")
+
+    assert pool.acquire("session") == HOST_B
+    # The session now follows its new host
+    pool.release(HOST_A)
+    pool.release(HOST_A)
+    assert pool.acquire("session") == HOST_B
+
+
+def test_acquire_skips_host_with_failed_health_check(pool: OllamaHostPool) -> None:
+    pool.mark_down(HOST_A)
+
+    assert pool.acquire() == HOST_B
+    assert pool.acquire() == HOST_B
+
+
+def test_acquire_skips_pinned_host_while_cooling_down(pool: OllamaHostPool) -> None:
+    pool.release(pool.acquire("session"), failed=True)
+
+    assert pool.acquire("session") == HOST_B
+
+
+def test_acquire_uses_least_loaded_host_when_all_are_down(pool: OllamaHostPool) -> None:
+    pool.acquire()
+    pool.mark_down(HOST_A)
+    pool.mark_down(HOST_B)
+
+    assert pool.acquire() == HOST_B
+    assert pool.least_in_flight() == 1
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from archive import ArchiveWriter, GenerationRecord, iter_archive
+
+
+def _record(prompt: str) -> GenerationRecord:
+    return GenerationRecord(
+        started_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        tier=1,
+        model="llama3.2",
+        prompt=prompt,
+        system_prompt_hash=None,
+        response="response",
+        chunk_count=1,
+        first_token_seconds=0.1,
+        total_seconds=0.5,
+    )
+
+
+def _writer(directory: Path, segment_max_bytes: int = 1 << 20) -> ArchiveWriter:
+    return ArchiveWriter(
+        directory=directory,
+        flush_interval=0.01,
+        batch_size=10,
+        queue_size=100,
+        segment_max_bytes=segment_max_bytes,
+    )
+
+
+def test_archive_writer_round_trips_records(tmp_path: Path) -> None:
+    writer = _writer(tmp_path)
+
+    writer.submit(_record("first"))
+    writer.submit(_record("second"))
+    writer.close()
+
+    assert [r.prompt for r in iter_archive(tmp_path)] == ["first", "second"]
+
+
+def test_archive_writer_rotates_full_segment(tmp_path: Path) -> None:
+    writer = _writer(tmp_path, segment_max_bytes=1)
+
+    for prompt in ("first", "second"):
+        writer.submit(_record(prompt))
+        writer.close()
+
+    assert len(list(tmp_path.glob("generations-*.jsonl.gz"))) == 2
+
+
+def test_archive_writer_starts_new_segment_after_removal(tmp_path: Path) -> None:
+    writer = _writer(tmp_path)
+    writer.submit(_record("first"))
+    writer.close()
+
+    for segment in tmp_path.iterdir():
+        segment.unlink()
+    writer.submit(_record("second"))
+    writer.close()
+
+    assert [r.prompt for r in iter_archive(tmp_path)] == ["second"]
+
+
+def test_archive_writer_recreates_removed_directory(tmp_path: Path) -> None:
+    directory = tmp_path / "archive"
+    writer = _writer(directory)
+    writer.submit(_record("first"))
+    writer.close()
+
+    for segment in directory.iterdir():
+        segment.unlink()
+    directory.rmdir()
+    writer.submit(_record("second"))
+    writer.close()
+
+    assert [r.prompt for r in iter_archive(directory)] == ["second"]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from media import _parse_range
+
+SIZE = 1000
+
+
+@pytest.mark.parametrize("header", [None, "", "bytes=-", "items=0-10", "bytes=0-1,5-6", "bytes=a-b"])
+def test_parse_range_invalid_or_missing_serves_whole_asset(header: str | None) -> None:
+    assert _parse_range(header, SIZE) == (0, SIZE)
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=0-99", (0, 100)),
+        ("bytes=100-199", (100, 200)),
+        ("bytes=999-999", (999, 1000)),
+        (" bytes=5-9 ", (5, 10)),
+    ],
+)
+def test_parse_range_closed_range(header: str, expected: tuple[int, int]) -> None:
+    assert _parse_range(header, SIZE) == expected
+
+
+def test_parse_range_open_ended_runs_to_end() -> None:
+    assert _parse_range("bytes=200-", SIZE) == (200, SIZE)
+
+
+def test_parse_range_last_byte_past_end_is_clamped() -> None:
+    assert _parse_range("bytes=900-5000", SIZE) == (900, SIZE)
+
+
+def test_parse_range_suffix_returns_final_bytes() -> None:
+    assert _parse_range("bytes=-100", SIZE) == (900, SIZE)
+
+
+def test_parse_range_suffix_longer_than_asset_returns_whole_asset() -> None:
+    assert _parse_range("bytes=-5000", SIZE) == (0, SIZE)
+
+
+def test_parse_range_inverted_range_is_ignored() -> None:
+    assert _parse_range("bytes=5-2", SIZE) == (0, SIZE)
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-1100", "bytes=-0"])
+def test_parse_range_unsatisfiable(header: str) -> None:
+    assert _parse_range(header, SIZE) is None
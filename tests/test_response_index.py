@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pytest
+
+from response_index import ResponseIndex, normalize_prompt
+
+TIER, MODEL = 2, "llama3.2"
+
+
+def _index_with(prompt: str, response: str = "stored") -> ResponseIndex:
+    index = ResponseIndex(threshold=0.8)
+    index.add(TIER, MODEL, None, prompt, response)
+    return index
+
+
+def test_normalize_prompt_folds_case_punctuation_and_whitespace() -> None:
+    assert normalize_prompt("  I  don't\tknow   WHAT to do!! ") == "i dont know what to do"
+
+
+def test_lookup_exact_normalized_match() -> None:
+    index = _index_with("I feel overwhelmed at work.")
+
+    match = index.lookup(TIER, MODEL, None, "i feel OVERWHELMED at work")
+
+    assert match is not None
+    assert match.response == "stored"
+    assert match.similarity == 1.0
+
+
+def test_lookup_near_duplicate_above_threshold() -> None:
+    index = _index_with("I feel overwhelmed at work and I can't focus on anything lately")
+
+    match = index.lookup(TIER, MODEL, None, "I feel overwhelmed at work and I can't focus on anything lately.")
+    near = index.lookup(TIER, MODEL, None, "I feel so overwhelmed at work and I can't focus on anything lately")
+
+    assert match is not None and match.similarity == 1.0
+    assert near is not None and 0.8 <= near.similarity < 1.0
+
+
+def test_lookup_is_scoped_by_tier_model_and_system_prompt() -> None:
+    index = _index_with("I feel overwhelmed at work")
+
+    assert index.lookup(TIER + 1, MODEL, None, "I feel overwhelmed at work") is None
+    assert index.lookup(TIER, "other", None, "I feel overwhelmed at work") is None
+    assert index.lookup(TIER, MODEL, "Be kind.", "I feel overwhelmed at work") is None
+
+
+@pytest.mark.parametrize(
+    ("stored", "query"),
+    [
+        ("I want to talk to someone about how I feel", "I don't want to talk to someone about how I feel"),
+        ("I have been sleeping well and eating properly", "I have not been sleeping well and eating properly"),
+        ("I never feel like people understand me at all", "I feel like people understand me at all"),
+    ],
+)
+def test_lookup_negation_pair_does_not_match(stored: str, query: str) -> None:
+    index = _index_with(stored)
+
+    assert index.lookup(TIER, MODEL, None, query) is None
+
+
+@pytest.mark.parametrize(
+    ("stored", "query"),
+    [
+        ("I have been thinking about ending my lease", "I have been thinking about ending my life"),
+        ("I have been thinking about ending my life", "I have been thinking about ending my lease"),
+        ("Sometimes I want to hurt myself when I am alone", "Sometimes I want to hurt myself when I'm alone at night"),
+    ],
+)
+def test_lookup_risk_prompt_never_matches_near_duplicate(stored: str, query: str) -> None:
+    index = _index_with(stored)
+
+    assert index.lookup(TIER, MODEL, None, query) is None
+
+
+def test_lookup_risk_prompt_matches_exact_normalized_text() -> None:
+    index = _index_with("I have been thinking about ending my life.")
+
+    match = index.lookup(TIER, MODEL, None, "i have been thinking about ending my life")
+
+    assert match is not None
+    assert match.similarity == 1.0
+
+
+def test_add_merges_near_duplicate_into_existing_entry() -> None:
+    index = _index_with("I feel overwhelmed at work and I can't focus on anything lately")
+
+    index.add(TIER, MODEL, None, "I feel so overwhelmed at work and I can't focus on anything lately", "newer")
+
+    assert len(index) == 1
+
+
+def test_add_keeps_risk_prompt_separate_from_similar_entry() -> None:
+    index = _index_with("I have been thinking about ending my lease", "lease")
+
+    index.add(TIER, MODEL, None, "I have been thinking about ending my life", "crisis")
+
+    assert len(index) == 2
+    assert index.lookup(TIER, MODEL, None, "I have been thinking about ending my lease").response == "lease"